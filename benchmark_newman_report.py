@@ -0,0 +1,151 @@
+"""Benchmark the dashboard's report parsing, HTML rendering, table building and email encoding.
+
+Usage:
+    python benchmark_newman_report.py                      # run all sizes and print the results
+    python benchmark_newman_report.py --save               # also write them to the baseline file
+    python benchmark_newman_report.py --compare            # fail if a stage regressed against the baseline
+    python benchmark_newman_report.py --generate big.json --sizes 5000000 --body-bytes 400
+                                                           # only write a synthetic report (multi-GB at this size)
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000, 500000]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "baseline.json")
+SMTP_CONFIG = {"smtp_server": "localhost", "smtp_port": 25, "sender_email": "bench@example.com"}
+
+
+def measure(func, repeat):
+    """Return the best wall time over `repeat` runs and the peak traced memory of one more run"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    # Tracing slows everything down, so memory is measured in its own pass
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": round(best, 4), "peak_mb": round(peak / (1024 * 1024), 2)}
+
+
+def synthetic_run(size, args):
+    """Build the seeded generator for one report size from the command line options"""
+    from final_newman_report import SyntheticRun
+    return SyntheticRun(
+        size=size, failure_rate=args.failure_rate, latency=args.latency, services=args.services,
+        body_bytes=args.body_bytes, seed=args.seed
+    )
+
+
+def benchmark_size(dashboard, size, workdir, args):
+    """Benchmark every stage for one report size"""
+    json_path = os.path.join(workdir, f"report_{size}.json")
+    html_path = os.path.join(workdir, f"report_{size}.html")
+    synthetic_run(size, args).write(json_path)
+    repeat = args.repeat
+
+    # Warm up first, so one-off lazy imports (pandas, the email stack) are not timed as part of a stage
+    data = dashboard.load_json_report(json_path)
+    executions = data["run"]["executions"]
+    dashboard.generate_html_report(data, html_path)
+    dashboard.build_execution_table(executions[:1])
+    dashboard.build_email_message(html_path, ["qa@example.com"], SMTP_CONFIG)
+
+    return {
+        "parse_json": measure(lambda: dashboard.load_json_report(json_path), repeat),
+        "html_report": measure(lambda: dashboard.generate_html_report(data, html_path), repeat),
+        "dataframe": measure(lambda: dashboard.build_execution_table(executions), repeat),
+        "email_encode": measure(
+            lambda: dashboard.build_email_message(html_path, ["qa@example.com"], SMTP_CONFIG, "auto").as_bytes(),
+            repeat
+        )
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return the stages that are slower or heavier than the baseline by more than `tolerance`"""
+    regressions = []
+    for size, stages in results.items():
+        for stage, current in stages.items():
+            previous = baseline.get(size, {}).get(stage)
+            if not previous:
+                continue
+            for metric in ("seconds", "peak_mb"):
+                # Ignore tiny absolute numbers where timer noise dominates
+                if previous[metric] >= 0.01 and current[metric] > previous[metric] * (1 + tolerance):
+                    regressions.append(f"{size} executions / {stage}: {metric} "
+                                       f"{previous[metric]} -> {current[metric]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Newman dashboard's report handling")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Execution counts to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage (best is kept)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results file")
+    parser.add_argument("--save", action="store_true", help="Write the results to the baseline file")
+    parser.add_argument("--compare", action="store_true", help="Compare against the baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--seed", type=int, default=1234, help="Seed for the synthetic reports")
+    parser.add_argument("--failure-rate", type=float, default=0.1, help="Share of requests that fail")
+    parser.add_argument("--latency", default="lognormal", choices=["lognormal", "normal", "uniform", "exponential"],
+                        help="Response time distribution")
+    parser.add_argument("--services", type=int, default=4, help="Number of services the requests are spread over")
+    parser.add_argument("--body-bytes", type=int, default=0, help="Response body size per request")
+    parser.add_argument("--generate", metavar="PATH", help="Only write a synthetic report of the first size to PATH")
+    args = parser.parse_args()
+
+    if args.generate:
+        summary = synthetic_run(args.sizes[0], args).write(args.generate)
+        print(f"Wrote {summary.requests} executions ({summary.failed_requests} failed) to {args.generate}")
+        return 0
+
+    baseline_path = os.path.abspath(args.baseline)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # The dashboard keeps its history and report index under reports/, so keep those out of the repo
+        os.chdir(workdir)
+        from final_newman_report import TestDashboard
+        dashboard = TestDashboard()
+
+        results = {}
+        for size in args.sizes:
+            results[str(size)] = benchmark_size(dashboard, size, workdir, args)
+            for stage, metrics in results[str(size)].items():
+                print(f"{size:>8} executions  {stage:<13} {metrics['seconds']:>9.4f}s  {metrics['peak_mb']:>9.2f} MB")
+
+    exit_code = 0
+    if args.compare:
+        if not os.path.exists(baseline_path):
+            print(f"No baseline at {baseline_path}; run with --save first")
+            exit_code = 1
+        else:
+            with open(baseline_path) as f:
+                regressions = compare(results, json.load(f)["results"], args.tolerance)
+            for regression in regressions:
+                print(f"REGRESSION {regression}")
+            exit_code = 1 if regressions else 0
+
+    if args.save:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump({"python": sys.version.split()[0], "repeat": args.repeat, "results": results}, f, indent=2)
+        print(f"Baseline saved to {baseline_path}")
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    sys.exit(main())
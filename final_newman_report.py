@@ -1,318 +1,3745 @@
-import streamlit as st
 import subprocess
 import json
+import math
 import os
-import time
 import datetime
+import re
+import sys
+import threading
+import time
+import uuid
+import contextlib
+import csv
+import shutil
+import copy
+import functools
+import hashlib
+import heapq
+import hmac
+import string
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
-import smtplib
 import base64
+import gzip
+import io
+import queue
+import zipfile
+import sqlite3
+
+# Streamlit, pandas, plotly and the email stack are imported where they are used,
+# so the headless command line starts without them
+PAGE_CSS = """
+<style>
+    .main-header {
+        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
+        padding: 2rem;
+        border-radius: 10px;
+        color: white;
+        text-align: center;
+        margin-bottom: 2rem;
+    }
+    .metric-card {
+        background: white;
+        padding: 1rem;
+        border-radius: 8px;
+        border-left: 4px solid #667eea;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+    }
+    .success-card {
+        border-left-color: #10b981;
+    }
+    .error-card {
+        border-left-color: #ef4444;
+    }
+    .warning-card {
+        border-left-color: #f59e0b;
+    }
+    .stButton > button {
+        width: 100%;
+        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
+        color: white;
+        border: none;
+        padding: 0.75rem;
+        border-radius: 8px;
+        font-weight: bold;
+    }
+    .download-btn {
+        background: linear-gradient(90deg, #10b981 0%, #059669 100%) !important;
+    }
+    .email-btn {
+        background: linear-gradient(90deg, #8b5cf6 0%, #7c3aed 100%) !important;
+    }
+</style>
+"""
+
+# Streamed HTML report; rows are written between the head and the tail
+REPORT_HEAD = string.Template("""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>Test Execution Report</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; background: #f5f5f5; }
+        .container { max-width: 1200px; margin: 0 auto; background: white; padding: 30px; border-radius: 10px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); }
+        .header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; border-radius: 10px; text-align: center; margin-bottom: 30px; }
+        .summary { display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 20px; margin-bottom: 30px; }
+        .card { background: #f8f9fa; padding: 20px; border-radius: 10px; text-align: center; border-left: 5px solid; }
+        .card.total { border-left-color: #3b82f6; }
+        .card.passed { border-left-color: #10b981; }
+        .card.failed { border-left-color: #ef4444; }
+        .card.pending { border-left-color: #f59e0b; }
+        .card h3 { font-size: 2.5em; margin: 0; }
+        .card p { margin: 10px 0 0 0; color: #666; font-weight: bold; }
+        .section { margin: 30px 0; }
+        .section h2 { color: #333; border-bottom: 2px solid #667eea; padding-bottom: 10px; }
+        table { width: 100%; border-collapse: collapse; margin-top: 20px; }
+        th, td { padding: 12px; text-align: left; border-bottom: 1px solid #e5e7eb; }
+        th { background: #f9fafb; font-weight: 600; }
+        .status-passed { color: #10b981; font-weight: bold; }
+        .status-failed { color: #ef4444; font-weight: bold; }
+        .controls { display: flex; gap: 10px; align-items: center; flex-wrap: wrap; }
+        .controls input, .controls select, .controls button { padding: 6px 10px; }
+        .footer { text-align: center; margin-top: 40px; color: #666; font-size: 0.9em; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>🧪 Test Execution Report</h1>
+            <p>Generated on $generated</p>
+        </div>
+
+        <div class="summary">
+            <div class="card total"><h3>$total</h3><p>Total Tests</p></div>
+            <div class="card passed"><h3>$passed</h3><p>Passed</p></div>
+            <div class="card failed"><h3>$failed</h3><p>Failed</p></div>
+            <div class="card pending"><h3>$pending</h3><p>Pending</p></div>
+        </div>
+
+        <div class="section">
+            <h2>📊 Execution Summary</h2>
+            <table>
+                <tr><td><strong>Total Requests:</strong></td><td>$total_requests</td></tr>
+                <tr><td><strong>Failed Requests:</strong></td><td>$failed_requests</td></tr>
+                <tr><td><strong>Total Assertions:</strong></td><td>$total_assertions</td></tr>
+                <tr><td><strong>Failed Assertions:</strong></td><td>$failed_assertions</td></tr>
+            </table>
+        </div>
+
+        <div class="section">
+            <h2>⏱️ Response Times</h2>
+            $latency_chart
+        </div>
+
+        <div class="section">
+            <h2>📝 Request Details</h2>
+            <div class="controls">
+                <input id="search" type="search" placeholder="Filter by name or error">
+                <select id="status">
+                    <option value="">All statuses</option>
+                    <option value="FAILED">Failed</option>
+                    <option value="PASSED">Passed</option>
+                </select>
+                <select id="page-size">
+                    <option>25</option><option selected>50</option><option>100</option><option>500</option>
+                </select>
+                <button id="prev">◀</button>
+                <span id="page-info"></span>
+                <button id="next">▶</button>
+            </div>
+            <table>
+                <thead><tr><th>Name</th><th>Status</th><th>Code</th><th>Time (ms)</th><th>Assertion Errors</th></tr></thead>
+                <tbody id="rows"></tbody>
+            </table>
+        </div>
+<script>
+const rows = [
+""")
+
+REPORT_TAIL = string.Template("""];
+(function () {
+    const search = document.getElementById("search");
+    const status = document.getElementById("status");
+    const pageSize = document.getElementById("page-size");
+    const body = document.getElementById("rows");
+    const info = document.getElementById("page-info");
+    let filtered = rows;
+    let page = 0;
+
+    function escape(text) {
+        return String(text).replace(/[&<>"]/g, c => ({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})[c]);
+    }
+
+    function render() {
+        const size = Number(pageSize.value);
+        const pages = Math.max(1, Math.ceil(filtered.length / size));
+        page = Math.min(page, pages - 1);
+        body.innerHTML = filtered.slice(page * size, (page + 1) * size).map(row =>
+            "<tr><td>" + escape(row[0]) + "</td><td class=\\"status-" + row[1].toLowerCase() + "\\">" + row[1] +
+            "</td><td>" + row[2] + "</td><td>" + row[3] + "</td><td>" + row[4].map(escape).join("<br>") + "</td></tr>"
+        ).join("");
+        info.textContent = "Page " + (page + 1) + " of " + pages + " (" + filtered.length + " requests)";
+    }
+
+    function applyFilters() {
+        const text = search.value.toLowerCase();
+        filtered = rows.filter(row =>
+            (!status.value || row[1] === status.value) &&
+            (!text || row[0].toLowerCase().includes(text) || row[4].some(e => e.toLowerCase().includes(text)))
+        );
+        page = 0;
+        render();
+    }
+
+    search.addEventListener("input", applyFilters);
+    status.addEventListener("change", applyFilters);
+    pageSize.addEventListener("change", render);
+    document.getElementById("prev").addEventListener("click", () => { page = Math.max(0, page - 1); render(); });
+    document.getElementById("next").addEventListener("click", () => { page += 1; render(); });
+    render();
+})();
+</script>
+
+        <div class="footer">
+            <p>Report generated by Newman Test Dashboard | $year</p>
+        </div>
+    </div>
+</body>
+</html>
+""")
+
+# Attachments above this size are gzipped when compression is set to "auto"
+AUTO_COMPRESS_BYTES = 1024 * 1024
+
+# Limits shared by every session of the dashboard
+MAX_CONCURRENT_JOBS = 4
+MAX_NEWMAN_PROCESSES = os.cpu_count() or 1
+AGENT_PORT = int(os.environ.get("NEWMAN_AGENT_PORT", 8765))  # Coordinator port for distributed runs
+PYTHON_ENGINE_CONCURRENCY = 20  # Requests the Python engine keeps in flight per run
+
+class TestDashboard:
+    def __init__(self, process_slots=None, engine="newman", coordinator=None):
+        self.collections_path = "collections/"  # Path to your Postman collections
+        self.reports_path = "reports/"
+        self.process_slots = process_slots  # Caps Newman processes across all users when set
+        self.engine = engine  # "newman", "python" for the in-process async HTTP runner, or "agents"
+        self.coordinator = coordinator  # AgentCoordinator that hands runs to remote agents
+        self.python_engine_concurrency = PYTHON_ENGINE_CONCURRENCY
+        self.dataset_path = os.path.join(self.reports_path, "dataset")  # Partitioned Parquet export
+        self.mock_settings = {"size": 45, "failure_rate": 0.1, "seed": None}  # Used when Newman is unavailable
+        self.capture_timings = False  # Adds --verbose so Newman reports DNS/connect/TLS/first byte per request
+        self.timer = PhaseTimer()
+        self.build_analytics = True  # The dashboard shows them; the command line skips pandas entirely
+        self.metrics_path = os.path.join(self.reports_path, "metrics.prom")
+        self.reuse_window = 0  # Seconds a result stays reusable when its folder, environment and engine are unchanged
+        self.ensure_directories()
+
+        # Mock service configurations
+        self.all_services = [
+            "User Authentication Service",
+            "Payment Gateway Service",
+            "Order Management Service",
+            "Inventory Service",
+            "Notification Service",
+            "Analytics Service",
+            "Reporting Service",
+            "Security Service"
+        ]
+
+        self.services_with_dependencies = {
+            "Payment Gateway Service": ["User Authentication Service"],
+            "Order Management Service": ["Payment Gateway Service", "Inventory Service"],
+            "Notification Service": ["User Authentication Service", "Order Management Service"]
+        }
+
+        self.history = RunHistory(os.path.join(self.reports_path, "history.db"))
+        self.reports = ReportStore(self.reports_path, os.path.join(self.reports_path, "history.db"))
+
+    def ensure_directories(self):
+        """Create necessary directories if they don't exist"""
+        Path(self.collections_path).mkdir(exist_ok=True)
+        Path(self.reports_path).mkdir(exist_ok=True)
+
+    def run_newman_command(self, collection_path, environment=None, folder=None, progress=None, label=None,
+                           reuse=True):
+        """Execute Newman command and return results, reusing a fresh result when nothing relevant changed"""
+        fingerprint = self.fingerprint(collection_path, environment, folder)
+        if fingerprint and self.reuse_window and reuse:
+            cached = self.recall_result(fingerprint, progress)
+            if cached:
+                return cached
+
+        results = self.run_collection(collection_path, environment, folder, progress, label)
+        if fingerprint and results.get('json_data') and not results.get('mock'):
+            self.reports.remember(fingerprint, results)
+        return results
+
+    def fingerprint(self, collection_path, environment=None, folder=None):
+        """Hash a folder's requests, inherited settings, environment and engine: all that decides its outcome"""
+        try:
+            with open(collection_path, 'r', encoding='utf-8') as f:
+                collection = json.load(f)
+            environment_data = None
+            if environment:
+                with open(environment, 'r', encoding='utf-8') as f:
+                    environment_data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        def settings(node):
+            # Auth, variables and scripts are inherited by every request below the node
+            return {key: value for key, value in node.items() if key not in ("item", "info")}
+
+        def find(items, inherited):
+            for item in items:
+                if item.get('name') == folder and 'item' in item:
+                    return item, inherited + [settings(item)]
+                if 'item' in item:
+                    found = find(item['item'], inherited + [settings(item)])
+                    if found:
+                        return found
+            return None
+
+        target, inherited = collection, [settings(collection)]
+        if folder:
+            found = find(collection.get('item', []), inherited)
+            if not found:
+                return None
+            target, inherited = found
+
+        payload = {
+            "settings": inherited,
+            "items": target.get('item', []),
+            "folder": folder,
+            "environment": environment_data,
+            "engine": self.engine
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def recall_result(self, fingerprint, progress=None):
+        """Return a still-fresh earlier result for the same fingerprint without running anything"""
+        cached = self.reports.recall(fingerprint, self.reuse_window)
+        if not cached:
+            return None
+        try:
+            json_data = self.load_json_report(cached['json_report'])
+        except (OSError, ValueError):
+            return None
+
+        executions = json_data['run'].get('executions', [])
+        if progress:
+            progress.expect(len(executions))
+            for execution in executions:
+                progress.record(
+                    execution['item']['name'],
+                    not any(assertion.get('error') for assertion in execution.get('assertions', []))
+                )
+
+        return {
+            "run_id": self.reports.new_run_id(),
+            "success": cached['success'],
+            "html_report": cached['html_report'],
+            "json_report": cached['json_report'],
+            "json_data": json_data,
+            "cached": True,
+            "cached_at": cached['finished_at']
+        }
+
+    def run_collection(self, collection_path, environment=None, folder=None, progress=None, label=None):
+        """Run a collection or one of its folders on the selected engine"""
+        # Every call gets its own run ID, so concurrent or same-second runs never share files
+        run_id = self.reports.new_run_id()
+        report_path, json_report_path = self.reports.report_paths(run_id, label or folder)
+
+        if self.engine == "python":
+            with self.timer.phase("python_engine"):
+                results = self.run_python_engine(
+                    collection_path, environment, folder, progress, report_path, json_report_path
+                )
+            return dict(results, run_id=run_id)
+
+        if self.engine == "agents":
+            with self.timer.phase("agents"):
+                results = self.run_on_agents(collection_path, environment, folder, progress, label,
+                                             report_path, json_report_path)
+            return dict(results, run_id=run_id)
+
+        # Build Newman command; the CLI reporter drives live progress
+        cmd = [
+            "newman", "run", collection_path,
+            "--reporters", "cli,html,json",
+            "--color", "off",
+            "--reporter-html-export", report_path,
+            "--reporter-json-export", json_report_path
+        ]
+
+        if environment:
+            cmd.extend(["--environment", environment])
+
+        if folder:
+            cmd.extend(["--folder", folder])
+
+        if self.capture_timings:
+            cmd.append("--verbose")
+
+        try:
+            with self.process_slots or contextlib.nullcontext():
+                with self.timer.phase("newman"):
+                    process, stdout, stderr, timed_out = self.follow_newman_process(
+                        cmd, collection_path, folder, progress
+                    )
+
+            if timed_out:
+                raise subprocess.TimeoutExpired(cmd, 300)
+
+            # Parse JSON report for detailed results
+            if os.path.exists(json_report_path):
+                with self.timer.phase("parse"):
+                    json_results = self.load_json_report(json_report_path)
+                return {
+                    "run_id": run_id,
+                    "success": process.returncode == 0,
+                    "html_report": report_path,
+                    "json_report": json_report_path,
+                    "json_data": json_results,
+                    "stdout": stdout,
+                    "stderr": stderr
+                }
+            else:
+                # Return mock data if Newman is not available
+                return self.generate_mock_results(report_path, progress)
+
+        except subprocess.TimeoutExpired:
+            return {"success": False, "error": "Test execution timed out"}
+        except FileNotFoundError:
+            # Newman not installed, return mock data
+            return self.generate_mock_results(report_path, progress)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def follow_newman_process(self, cmd, collection_path, folder, progress):
+        """Run Newman to completion, feeding its CLI output to the progress tracker"""
+        process = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding='utf-8', errors='replace'
+        )
+        if progress:
+            progress.expect(self.count_collection_requests(collection_path, folder))
+
+        # Only a tail of the output is kept for error display; the CLI reporter prints every request
+        # (and whole requests and responses with --verbose), so keeping it all would grow with the run
+        stderr_lines = deque(maxlen=200)
+        stderr_reader = threading.Thread(target=lambda: stderr_lines.extend(process.stderr), daemon=True)
+        stderr_reader.start()
+
+        timed_out = []
+        def kill():
+            timed_out.append(True)
+            process.kill()
+        watchdog = threading.Timer(300, kill)
+        watchdog.start()
+
+        stdout_lines = deque(maxlen=200)
+        cli_parser = NewmanCliParser(progress)
+        started = time.perf_counter()
+        try:
+            for line in process.stdout:
+                stdout_lines.append(line)
+                cli_parser.feed(line)
+            self.reap_process(process, folder or "collection", started)
+        finally:
+            watchdog.cancel()
+        cli_parser.close()
+        stderr_reader.join()
+
+        return process, "".join(stdout_lines), "".join(stderr_lines), bool(timed_out)
+
+    def reap_process(self, process, label, started):
+        """Wait for Newman and record its own CPU time and peak memory"""
+        if not hasattr(os, 'wait4'):
+            process.wait()
+            return
+        # wait4 reports usage for this child only, which stays accurate with parallel runs
+        try:
+            _, status, usage = os.wait4(process.pid, 0)
+        except ChildProcessError:
+            # The timeout watchdog's kill() already reaped it
+            process.wait()
+            return
+        process.returncode = os.waitstatus_to_exitcode(status)
+        self.timer.add_process(label, time.perf_counter() - started, usage)
+
+    def run_python_engine(self, collection_path, environment, folder, progress, report_path, json_report_path):
+        """Run the collection in-process with the async HTTP runner, producing a Newman-shaped report"""
+        import asyncio
+
+        try:
+            with open(collection_path, 'r', encoding='utf-8') as f:
+                collection = json.load(f)
+            environment_data = None
+            if environment:
+                with open(environment, 'r', encoding='utf-8') as f:
+                    environment_data = json.load(f)
+
+            runner = AsyncCollectionRunner(collection, environment_data, self.python_engine_concurrency)
+            json_results = asyncio.run(runner.run(folder, progress))
+        except ImportError:
+            return {"success": False, "error": "The Python engine needs aiohttp (pip install aiohttp)"}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+        with open(json_report_path, 'w') as f:
+            json.dump(json_results, f)
+        self.generate_html_report(json_results, report_path)
+
+        stats = json_results['run']['stats']
+        return {
+            "success": stats['assertions']['failed'] == 0 and stats['requests']['failed'] == 0,
+            "html_report": report_path,
+            "json_report": json_report_path,
+            "json_data": json_results,
+            "stdout": "",
+            "stderr": ""
+        }
+
+    def run_on_agents(self, collection_path, environment, folder, progress, label, report_path, json_report_path):
+        """Run a folder or shard on whichever agent picks it up and write its reports locally"""
+        if not self.coordinator:
+            return {"success": False, "error": "Distributed runs need a coordinator with registered agents"}
+
+        try:
+            results = self.coordinator.run(collection_path, environment, folder, progress, label)
+        except (OSError, ValueError) as e:
+            return {"success": False, "error": str(e)}
+        if not results.get('json_data'):
+            return results
+
+        with open(json_report_path, 'w') as f:
+            json.dump(results['json_data'], f)
+        self.generate_html_report(results['json_data'], report_path)
+        return dict(results, html_report=report_path, json_report=json_report_path)
+
+    def count_collection_requests(self, collection_path, folder=None):
+        """Count the requests Newman will run, optionally limited to one folder"""
+        try:
+            with open(collection_path, 'r', encoding='utf-8') as f:
+                collection = json.load(f)
+        except (OSError, ValueError):
+            return 0
+
+        def count(items, inside_folder):
+            total = 0
+            for item in items:
+                selected = inside_folder or folder is None or item.get('name') == folder
+                if 'item' in item:
+                    total += count(item['item'], selected)
+                elif selected:
+                    total += 1
+            return total
+
+        return count(collection.get('item', []), False)
+
+    def load_json_report(self, json_report_path):
+        """Stream a Newman JSON report, keeping only the execution fields the dashboard uses"""
+        stats = None
+        timings = None
+        executions = []
+        summary = ExecutionSummary()
+
+        opener = gzip.open if json_report_path.endswith('.gz') else open
+        with opener(json_report_path, 'rt', encoding='utf-8') as f:
+            stream = JsonStream(f)
+            for key in stream.object_keys():
+                if key != 'run':
+                    stream.skip()
+                    continue
+                for run_key in stream.object_keys():
+                    if run_key == 'stats':
+                        stats = stream.value()
+                    elif run_key == 'timings':
+                        timings = stream.value()
+                    elif run_key == 'executions':
+                        # Response bodies are dropped record by record, so memory tracks the slim rows only
+                        for execution in stream.array_values():
+                            execution = self.slim_execution(execution)
+                            summary.add(execution)
+                            executions.append(execution)
+                    else:
+                        stream.skip()
+
+        return {
+            "run": {
+                "stats": stats or summary.stats(),
+                "timings": timings or summary.timings(),
+                "executions": executions
+            }
+        }
+
+    def slim_execution(self, execution):
+        """Reduce a Newman execution to name, response time, status code and assertion errors"""
+        response = execution.get('response') or {}
+        slim = {
+            "item": {"name": (execution.get('item') or {}).get('name')},
+            "response": {
+                "responseTime": response.get('responseTime', 0),
+                "code": response.get('code', 0)
+            },
+            "assertions": [
+                {
+                    "assertion": assertion.get('assertion'),
+                    "error": {"message": assertion['error'].get('message')} if assertion.get('error') else None
+                }
+                for assertion in execution.get('assertions') or []
+            ]
+        }
+        phases = timing_phases(response)
+        if phases:
+            slim['response']['timings'] = phases
+        if 'folder' in execution:
+            slim['folder'] = execution['folder']
+        return slim
+
+    def execute_tests(self, execution_type, collection_path, environment=None, services=None, max_workers=None,
+                      progress=None, shards=1):
+        """Run the folders that belong to an execution type from the sidebar"""
+        started_at = datetime.datetime.now()
+        self.timer.reset()
+        if execution_type == "Run Services with Dependencies":
+            results = self.run_services_with_dependencies(
+                collection_path, environment, max_workers=max_workers, progress=progress
+            )
+        else:
+            if execution_type == "Run the Regression Suite":
+                services = self.all_services
+            if shards > 1:
+                results = self.run_sharded(collection_path, environment, services, shards, max_workers, progress)
+            else:
+                results = self.run_services_parallel(collection_path, environment, services, max_workers, progress)
+
+        return self.finish_run(results, started_at, execution_type)
+
+    def finish_run(self, results, started_at, execution_type):
+        """Record, index and export a finished run, then attach its diagnostics and update the metrics file"""
+        parquet_export = None
+        if results.get('json_data'):
+            results.setdefault('run_id', self.reports.new_run_id())
+            if self.build_analytics:
+                results['analytics'] = self.build_latency_analytics(
+                    results['json_data']['run'].get('executions', [])
+                )
+            results['clusters'] = cluster_failures(results['json_data']['run'].get('executions', []))
+            # Synthetic runs (Newman not found) must not reach the trends, the cluster index or the dataset
+            if not results.get('mock'):
+                self.history.record_run(results['run_id'], started_at, execution_type, results)
+                self.history.record_clusters(results['run_id'], started_at, results['clusters'])
+            self.reports.register_run(results)
+            if not results.get('mock'):
+                parquet_export = self.export_parquet(results)
+            self.apply_retention()
+
+        results['diagnostics'] = self.timer.snapshot()
+        results['diagnostics']['total_seconds'] = (datetime.datetime.now() - started_at).total_seconds()
+        if results.get('json_data'):
+            results['diagnostics']['request_phases'] = request_phase_summary(
+                results['json_data']['run'].get('executions', [])
+            )
+        if parquet_export:
+            exported, message = parquet_export
+            results['diagnostics']['parquet_export'] = {"success": exported, "message": message}
+        self.write_metrics(results)
+        return results
+
+    def write_metrics(self, results):
+        """Write the last run's diagnostics in the Prometheus text format for a local scraper"""
+        diagnostics = results['diagnostics']
+        lines = [
+            "# HELP newman_dashboard_run_seconds Wall time of the last test run",
+            "# TYPE newman_dashboard_run_seconds gauge",
+            f"newman_dashboard_run_seconds {diagnostics['total_seconds']:.6f}",
+            "# HELP newman_dashboard_phase_seconds Time spent in each phase of the last run, summed over calls",
+            "# TYPE newman_dashboard_phase_seconds gauge"
+        ]
+        lines += [
+            f'newman_dashboard_phase_seconds{{phase="{name}"}} {phase["seconds"]:.6f}'
+            for name, phase in diagnostics['phases'].items()
+        ]
+
+        processes = diagnostics['processes']
+        lines += [
+            "# HELP newman_dashboard_newman_cpu_seconds CPU time used by Newman processes in the last run",
+            "# TYPE newman_dashboard_newman_cpu_seconds gauge",
+            f'newman_dashboard_newman_cpu_seconds{{mode="user"}} {sum(p["cpu_user"] for p in processes):.6f}',
+            f'newman_dashboard_newman_cpu_seconds{{mode="system"}} {sum(p["cpu_system"] for p in processes):.6f}',
+            "# HELP newman_dashboard_newman_max_rss_bytes Largest resident set of a Newman process in the last run",
+            "# TYPE newman_dashboard_newman_max_rss_bytes gauge",
+            f"newman_dashboard_newman_max_rss_bytes {max((p['max_rss_bytes'] for p in processes), default=0)}"
+        ]
+
+        if results.get('json_data'):
+            stats = results['json_data']['run']['stats']
+            lines += [
+                "# HELP newman_dashboard_requests Requests in the last run",
+                "# TYPE newman_dashboard_requests gauge",
+                f'newman_dashboard_requests{{result="total"}} {stats["requests"]["total"]}',
+                f'newman_dashboard_requests{{result="failed"}} {stats["requests"]["failed"]}'
+            ]
+
+        request_phases = diagnostics.get('request_phases') or {}
+        if request_phases:
+            lines += [
+                "# HELP newman_dashboard_request_phase_seconds Per-request timing phases of the last run",
+                "# TYPE newman_dashboard_request_phase_seconds gauge"
+            ]
+            for name, summary in request_phases.items():
+                for quantile, key in (("0.5", "p50"), ("0.95", "p95")):
+                    lines.append(
+                        f'newman_dashboard_request_phase_seconds{{phase="{name}",quantile="{quantile}"}} '
+                        f'{summary[key] / 1000:.6f}'
+                    )
+
+        # Write then rename, so a scraper never reads half a file
+        os.makedirs(os.path.dirname(self.metrics_path), exist_ok=True)
+        temp_path = self.metrics_path + ".tmp"
+        with open(temp_path, 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(temp_path, self.metrics_path)
+
+    def export_rows(self, results):
+        """Yield one typed export row per execution of a run"""
+        for execution in results['json_data']['run'].get('executions', []):
+            response = execution.get('response', {})
+            assertions = execution.get('assertions', [])
+            errors = [assertion['error'].get('message', '') for assertion in assertions if assertion.get('error')]
+            yield {
+                "run_id": results.get('run_id'),
+                "service": execution.get('folder') or "Unassigned",
+                "item": execution['item']['name'],
+                "code": int(response.get('code', 0) or 0),
+                "response_time": float(response.get('responseTime', 0) or 0),
+                "assertions": len(assertions),
+                "failed_assertions": len(errors),
+                "error_messages": errors
+            }
+
+    def export_parquet(self, results):
+        """Append a run's executions to the Parquet dataset, partitioned by run date and service"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            return False, "Parquet export needs pyarrow (pip install pyarrow)"
+
+        schema = pa.schema([
+            ("run_id", pa.string()),
+            ("service", pa.string()),
+            ("item", pa.string()),
+            ("code", pa.int32()),
+            ("response_time", pa.float64()),
+            ("assertions", pa.int32()),
+            ("failed_assertions", pa.int32()),
+            ("error_messages", pa.list_(pa.string())),
+            ("run_date", pa.string())
+        ])
+        run_date = datetime.datetime.now().strftime('%Y-%m-%d')
+        rows = [dict(row, run_date=run_date) for row in self.export_rows(results)]
+        if not rows:
+            return False, "No executions to export"
+
+        try:
+            pq.write_to_dataset(
+                pa.Table.from_pylist(rows, schema=schema),
+                self.dataset_path,
+                partition_cols=["run_date", "service"],
+                basename_template=f"part-{results.get('run_id')}-{{i}}.parquet"
+            )
+        except (OSError, pa.ArrowException) as e:
+            return False, f"Parquet export failed: {e}"
+
+        # Index the written parts with the run, so retention counts and removes them too
+        if results.get('run_id'):
+            parts = Path(self.dataset_path, f"run_date={run_date}").rglob(f"part-{results['run_id']}-*.parquet")
+            self.reports.attach(results['run_id'], [str(part) for part in parts], kind="dataset")
+        return True, self.dataset_path
+
+    def apply_retention(self):
+        """Expire old runs' report files and dataset parts, and drop their rows from the run history"""
+        expired = self.reports.apply_retention()
+        self.history.delete_runs(expired)
+        self.history.delete_before(datetime.datetime.now() - datetime.timedelta(days=self.reports.max_age_days))
+        return expired
+
+    def csv_report_path(self, results):
+        return os.path.splitext(results['json_report'])[0] + ".csv"
+
+    def export_csv(self, results):
+        """Write a run's executions to CSV row by row and return the file path"""
+        csv_path = self.csv_report_path(results)
+        if os.path.exists(csv_path):
+            return csv_path
+
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            writer = None
+            for row in self.export_rows(results):
+                row["error_messages"] = " | ".join(row["error_messages"])
+                if writer is None:
+                    writer = csv.DictWriter(f, fieldnames=list(row))
+                    writer.writeheader()
+                writer.writerow(row)
+
+        if results.get('run_id'):
+            self.reports.attach(results['run_id'], [csv_path])
+        return csv_path
+
+    def build_execution_table(self, executions):
+        """Build the Detailed Results table column by column from the run's executions"""
+        import numpy as np
+        import pandas as pd
+
+        count = len(executions)
+        names = []
+        services = []
+        codes = np.zeros(count, dtype=np.int64)
+        times = np.zeros(count, dtype=float)
+        assertion_counts = np.zeros(count, dtype=np.int64)
+        failed_counts = np.zeros(count, dtype=np.int64)
+
+        for i, execution in enumerate(executions):
+            response = execution.get('response', {})
+            assertions = execution.get('assertions', [])
+            names.append(execution['item']['name'])
+            services.append(execution.get('folder') or "Unassigned")
+            codes[i] = response.get('code', 0) or 0
+            times[i] = response.get('responseTime', 0) or 0
+            assertion_counts[i] = len(assertions)
+            failed_counts[i] = sum(1 for assertion in assertions if assertion.get('error'))
+
+        return pd.DataFrame({
+            "Test Name": names,
+            "Service": services,
+            "Status": np.where(failed_counts > 0, "FAILED", "PASSED"),
+            "Response Time (ms)": times,
+            "Status Code": codes,
+            "Assertions": assertion_counts,
+            "Failed Assertions": failed_counts
+        })
+
+    def filter_execution_table(self, df, statuses=None, codes=None, latency_range=None,
+                               name_query="", sort_by="Response Time (ms)", ascending=False, pin_failures=True):
+        """Filter and sort the execution table with vectorized masks, failures first by default"""
+        import numpy as np
+
+        mask = np.ones(len(df), dtype=bool)
+        if statuses:
+            mask &= df["Status"].isin(statuses).to_numpy()
+        if codes:
+            mask &= df["Status Code"].isin(codes).to_numpy()
+        if latency_range:
+            times = df["Response Time (ms)"].to_numpy()
+            mask &= (times >= latency_range[0]) & (times <= latency_range[1])
+        if name_query:
+            mask &= df["Test Name"].str.contains(name_query, case=False, regex=False).to_numpy()
+
+        filtered = df[mask]
+        if pin_failures:
+            # Primary key is "not failed" so FAILED rows sort ahead of everything else
+            order = np.lexsort((
+                filtered[sort_by].to_numpy() if ascending else -filtered[sort_by].rank(method="dense").to_numpy(),
+                (filtered["Status"] != "FAILED").to_numpy()
+            ))
+            return filtered.iloc[order]
+        return filtered.sort_values(sort_by, ascending=ascending, kind="stable")
+
+    def build_summary_figures(self, stats):
+        """Build the results pie chart and the assertions bar chart"""
+        import plotly.express as px
+        import plotly.graph_objects as go
+
+        passed = stats['tests']['total'] - stats['tests']['failed'] - stats['tests']['pending']
+
+        # Pie chart for test results
+        labels = ['Passed', 'Failed', 'Pending']
+        values = [passed, stats['tests']['failed'], stats['tests']['pending']]
+        colors = ['#10b981', '#ef4444', '#f59e0b']
+
+        pie = go.Figure(data=[go.Pie(labels=labels, values=values, hole=.3)])
+        pie.update_traces(marker=dict(colors=colors))
+        pie.update_layout(title="Test Results Distribution", showlegend=True)
+
+        # Bar chart for assertions
+        categories = ['Total', 'Failed', 'Pending']
+        assertion_values = [
+            stats['assertions']['total'],
+            stats['assertions']['failed'],
+            stats['assertions']['pending']
+        ]
+
+        bar = px.bar(x=categories, y=assertion_values, title="Assertions Summary")
+        bar.update_traces(marker_color=['#3b82f6', '#ef4444', '#f59e0b'])
+        return pie, bar
+
+    def build_latency_analytics(self, executions, percentiles=(0.5, 0.9, 0.95, 0.99), max_bins=50):
+        """Compute response-time percentiles, a histogram and outliers for a run's executions"""
+        import numpy as np
+
+        frame = self.build_execution_table(executions)[["Test Name", "Service", "Status Code", "Response Time (ms)"]]
+        labels = {q: f"p{int(q * 100)}" for q in percentiles}
+        times = frame["Response Time (ms)"]
+
+        def summarize(column):
+            grouped = frame.groupby(column)["Response Time (ms)"]
+            table = grouped.quantile(list(percentiles)).unstack().rename(columns=labels)
+            table.insert(0, "Count", grouped.size())
+            table.insert(1, "Mean", grouped.mean())
+            return table.sort_values("p95", ascending=False).round(1)
+
+        if times.empty:
+            return {"percentiles": {}, "by_request": None, "by_service": None, "by_status_code": None,
+                    "histogram": None, "outliers": frame}
+
+        # Tukey's upper fence flags requests that are slow relative to this run
+        q1, q3 = np.percentile(times, [25, 75])
+        outlier_threshold = q3 + 1.5 * (q3 - q1)
+
+        counts, edges = np.histogram(times, bins=min(max_bins, max(1, int(np.sqrt(len(times))))))
+
+        overall = np.percentile(times, [q * 100 for q in percentiles])
+
+        return {
+            "percentiles": {labels[q]: float(value) for q, value in zip(percentiles, overall)},
+            "by_request": summarize("Test Name"),
+            "by_service": summarize("Service"),
+            "by_status_code": summarize("Status Code"),
+            "histogram": {"counts": counts, "edges": edges},
+            "outlier_threshold": float(outlier_threshold),
+            "outliers": frame[times > outlier_threshold].sort_values("Response Time (ms)", ascending=False)
+        }
+
+    def run_sharded(self, collection_path, environment=None, folders=None, shards=2, max_workers=None, progress=None):
+        """Split the selected requests into duration-balanced shards and run them as parallel Newman processes"""
+        try:
+            with open(collection_path, 'r', encoding='utf-8') as f:
+                collection = json.load(f)
+        except OSError:
+            # Nothing to split; the folder runs report the missing collection (or fall back to mock data)
+            return self.run_services_parallel(collection_path, environment, folders, max_workers, progress)
+        except ValueError as e:
+            return {"success": False, "error": f"Invalid collection file: {e}"}
+
+        requests = self.collection_requests(collection, folders)
+        if not requests:
+            return {"success": False, "error": "No requests found in the selected folders"}
+
+        shard_paths, shard_requests = self.write_shards(collection, requests, shards)
+        max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(shard_paths)))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                (f"Shard {i + 1}", executor.submit(
+                    self.run_newman_command, path, environment, None, progress, f"shard_{i + 1}"
+                ))
+                for i, path in enumerate(shard_paths)
+            ]
+            shard_results = [(label, future.result()) for label, future in futures]
+
+        # Attribute executions to their service folder rather than the shard that ran them. Newman runs a
+        # shard's requests in collection order, so the n-th execution of a name belongs to the n-th request
+        # with that name; several folders can each have their own "Health check"
+        for (_, result), requests in zip(shard_results, shard_requests):
+            folders = {}
+            for _, top_folder, name in requests:
+                folders.setdefault(name, deque()).append(top_folder)
+            for execution in (result.get('json_data') or {}).get('run', {}).get('executions', []):
+                queue = folders.get(execution['item']['name'])
+                if queue:
+                    execution.setdefault('folder', queue[0])
+                    queue.rotate(-1)
+
+        results = self.merge_folder_results(shard_results)
+        results['artifacts'] = shard_paths
+        return results
+
+    def collection_requests(self, collection, folders=None):
+        """List (path of item indexes, top-level folder, name) for every request in the selected folders"""
+        requests = []
+
+        def walk(items, path, top_folder, selected):
+            for index, item in enumerate(items):
+                item_top = top_folder or (item.get('name') if 'item' in item else None)
+                item_selected = selected or not folders or item.get('name') in folders
+                if 'item' in item:
+                    walk(item['item'], path + (index,), item_top, item_selected)
+                elif item_selected:
+                    requests.append((path + (index,), item_top, item.get('name')))
+
+        walk(collection.get('item', []), (), None, False)
+        return requests
+
+    def write_shards(self, collection, requests, shards):
+        """Balance requests across shards by historical duration and write one collection per shard
+
+        A request that reads a variable set by an earlier request stays in the same shard as it, so
+        setup chains (login -> token -> profile) are never split.
+        """
+        durations = self.historical_durations()
+        known = sorted(durations.values())
+        default = known[len(known) // 2] if known else 1.0
+
+        # Group requests connected through setup dependencies, keeping collection order inside a group
+        group_of = {path: path for path, _, _ in requests}
+
+        def find(path):
+            while group_of[path] != path:
+                group_of[path] = group_of[group_of[path]]
+                path = group_of[path]
+            return path
+
+        for path, setters in self.setup_dependencies(collection, requests).items():
+            for setter in setters:
+                group_of[find(setter)] = find(path)
+        groups = {}
+        for request in requests:
+            groups.setdefault(find(request[0]), []).append(request)
+
+        # Longest-processing-time first: give each group to the currently lightest shard
+        def duration(group):
+            return sum(durations.get(name, default) for _, _, name in group)
+
+        loads = [(0.0, i) for i in range(max(1, min(shards, len(groups))))]
+        assigned = {i: set() for _, i in loads}
+        for group in sorted(groups.values(), key=duration, reverse=True):
+            load, shard = heapq.heappop(loads)
+            assigned[shard].update(path for path, _, _ in group)
+            heapq.heappush(loads, (load + duration(group), shard))
+
+        shard_dir = Path(self.reports_path) / "shards"
+        shard_dir.mkdir(exist_ok=True)
+        batch = uuid.uuid4().hex[:8]
+
+        shard_paths = []
+        for shard, paths in sorted(assigned.items()):
+            shard_collection = self.filter_collection(collection, paths)
+            shard_path = shard_dir / f"collection_{batch}_shard_{shard + 1}.json"
+            with open(shard_path, 'w', encoding='utf-8') as f:
+                json.dump(shard_collection, f)
+            shard_paths.append(str(shard_path))
+
+        return shard_paths, [
+            [request for request in requests if request[0] in paths] for _, paths in sorted(assigned.items())
+        ]
+
+    def filter_collection(self, collection, keep):
+        """Copy a collection keeping only the requests at the given item index paths"""
+        def prune(items, path):
+            kept = []
+            for index, item in enumerate(items):
+                if 'item' in item:
+                    children = prune(item['item'], path + (index,))
+                    if children:
+                        # Folders keep their own scripts, auth and variables
+                        folder = {key: value for key, value in item.items() if key != 'item'}
+                        folder['item'] = children
+                        kept.append(folder)
+                elif path + (index,) in keep:
+                    kept.append(item)
+            return kept
+
+        filtered = copy.deepcopy({key: value for key, value in collection.items() if key != 'item'})
+        filtered['item'] = prune(collection.get('item', []), ())
+        return filtered
+
+    def rerun_failures(self, results, collection_path, environment=None, progress=None):
+        """Re-run only the failed requests (plus the setup requests they need) and merge them into the run"""
+        executions = results['json_data']['run']['executions']
+        failed = {
+            execution['item']['name'] for execution in executions
+            if any(assertion.get('error') for assertion in execution.get('assertions', []))
+        }
+        if not failed:
+            return results
+
+        try:
+            with open(collection_path, 'r', encoding='utf-8') as f:
+                collection = json.load(f)
+        except (OSError, ValueError) as e:
+            return dict(results, success=False, error=f"Cannot re-run failures: {e}")
+
+        requests = self.collection_requests(collection)
+        keep = self.requests_with_setup(collection, requests, failed)
+        if not keep:
+            return dict(results, success=False, error="Failed tests were not found in the collection")
+
+        started_at = datetime.datetime.now()
+        self.timer.reset()
+        rerun_dir = Path(self.reports_path) / "shards"
+        rerun_dir.mkdir(exist_ok=True)
+        rerun_path = rerun_dir / f"collection_{uuid.uuid4().hex[:8]}_rerun.json"
+        with open(rerun_path, 'w', encoding='utf-8') as f:
+            json.dump(self.filter_collection(collection, keep), f)
+
+        # A re-run exists to try the requests again, so a recent identical result must not stand in for it
+        rerun = self.run_newman_command(str(rerun_path), environment, progress=progress, label="rerun", reuse=False)
+        if not rerun.get('json_data'):
+            return dict(results, success=False, error=f"Re-run failed: {rerun.get('error', 'Unknown error')}")
+
+        # The merged run is a run of its own that points back at the original, so history,
+        # the report index, the Parquet export and the metrics all see it
+        merged_results = self.merge_rerun(results, rerun, failed)
+        merged_results['parent_run_id'] = results.get('run_id')
+        merged_results['run_id'] = self.reports.new_run_id()
+        merged_results['folder_results'] = {}
+        merged_results['artifacts'] = [rerun.get('json_report'), rerun.get('html_report'), str(rerun_path)]
+        execution_type = "Re-run Failed Tests"
+        if results.get('run_id'):
+            execution_type += f" of {results['run_id']}"
+        return self.finish_run(merged_results, started_at, execution_type)
+
+    def requests_with_setup(self, collection, requests, failed):
+        """Index paths of the failed requests and the earlier requests that set variables they use"""
+        dependencies = self.setup_dependencies(collection, requests)
+        keep = {path for path, _, name in requests if name in failed}
+
+        # Follow setup chains (login -> token -> session) transitively
+        pending = list(keep)
+        while pending:
+            for setter in dependencies[pending.pop()]:
+                if setter not in keep:
+                    keep.add(setter)
+                    pending.append(setter)
+        return keep
+
+    def setup_dependencies(self, collection, requests):
+        """Map each request's index path to the earlier requests that set a variable it reads"""
+        set_pattern = re.compile(r'pm\.(?:environment|collectionVariables|globals|variables)\.set\(\s*[\'"]([^\'"]+)')
+        get_pattern = re.compile(
+            r'{{\s*([^{}]+?)\s*}}|pm\.(?:environment|collectionVariables|globals|variables)\.get\(\s*[\'"]([^\'"]+)'
+        )
+
+        def item_at(path):
+            item = {'item': collection.get('item', [])}
+            for index in path:
+                item = item['item'][index]
+            return item
+
+        def strings(value):
+            if isinstance(value, str):
+                yield value
+            elif isinstance(value, dict):
+                for child in value.values():
+                    yield from strings(child)
+            elif isinstance(value, list):
+                for child in value:
+                    yield from strings(child)
+
+        dependencies = {}
+        setters = {}
+        for path, _, _ in requests:
+            text = "\n".join(strings(item_at(path)))
+            used = {a or b for a, b in get_pattern.findall(text)}
+            dependencies[path] = {setter for name in used for setter in setters.get(name, ())}
+            for name in set_pattern.findall(text):
+                setters.setdefault(name, []).append(path)
+        return dependencies
+
+    def merge_rerun(self, results, rerun, failed):
+        """Replace the failed executions with their re-run and update the run's stats"""
+        run = results['json_data']['run']
+        folders = {execution['item']['name']: execution.get('folder') for execution in run['executions']}
+
+        rerun_executions = {}
+        for execution in rerun['json_data']['run']['executions']:
+            if execution['item']['name'] in failed:
+                execution.setdefault('folder', folders.get(execution['item']['name']))
+                rerun_executions.setdefault(execution['item']['name'], []).append(execution)
+
+        old_summary = ExecutionSummary()
+        new_summary = ExecutionSummary()
+        executions = []
+        replaced = set()
+        for execution in run['executions']:
+            name = execution['item']['name']
+            if name not in rerun_executions:
+                executions.append(execution)
+                continue
+            old_summary.add(self.slim_execution(execution))
+            # The re-run executions take the place of the first original one
+            if name not in replaced:
+                replaced.add(name)
+                for replacement in rerun_executions[name]:
+                    new_summary.add(self.slim_execution(replacement))
+                    executions.append(replacement)
+
+        # Shift the original stats by what the re-run changed
+        stats = copy.deepcopy(run['stats'])
+        for key, (before, after) in {
+            "tests": (old_summary.failed_requests, new_summary.failed_requests),
+            "assertions": (old_summary.failed_assertions, new_summary.failed_assertions)
+        }.items():
+            stats[key]['failed'] = max(0, stats[key]['failed'] - before + after)
+        stats['assertions']['total'] += new_summary.assertions - old_summary.assertions
+
+        merged_data = {"run": dict(run, stats=stats, executions=executions)}
+        still_failing = sorted({
+            execution['item']['name'] for execution in executions
+            if any(assertion.get('error') for assertion in execution.get('assertions', []))
+        })
+
+        base_path = os.path.splitext(results.get('json_report') or rerun['json_report'])[0]
+        json_report_path = f"{base_path}_rerun.json"
+        report_path = f"{base_path}_rerun.html"
+        with open(json_report_path, 'w') as f:
+            json.dump(merged_data, f)
+        self.generate_html_report(merged_data, report_path)
+
+        merged_results = dict(
+            results,
+            success=not still_failing,
+            html_report=report_path,
+            json_report=json_report_path,
+            json_data=merged_data,
+            analytics=self.build_latency_analytics(executions),
+            # The original run's clusters would still list the failures the re-run fixed
+            clusters=cluster_failures(executions),
+            rerun={
+                "rerun": sorted(failed),
+                "now_passing": sorted(failed - set(still_failing)),
+                "still_failing": still_failing
+            }
+        )
+        merged_results.pop('error', None)
+        return merged_results
+
+    def historical_durations(self):
+        """Average response time per request name across recent run reports"""
+        comparator = RunComparator(self.reports_path, self.load_json_report, self.reports.run_reports)
+        comparator.update()
+
+        totals = {}
+        for run in comparator.runs.values():
+            for name, (_, latency) in run.items():
+                total, count = totals.get(name, (0.0, 0))
+                totals[name] = (total + latency, count + 1)
+        return {name: total / count for name, (total, count) in totals.items()}
+
+    def run_services_parallel(self, collection_path, environment=None, folders=None, max_workers=None, progress=None):
+        """Run one Newman process per folder across a bounded worker pool and merge the results"""
+        if not folders:
+            return self.run_newman_command(collection_path, environment, progress=progress)
+
+        return self.run_service_graph(
+            collection_path, environment, {folder: [] for folder in folders}, max_workers, progress
+        )
+
+    def run_services_with_dependencies(self, collection_path, environment=None, services=None, max_workers=None,
+                                       progress=None):
+        """Run services in dependency order, including the prerequisites they need"""
+        graph = {}
+        pending = list(services or self.services_with_dependencies)
+        while pending:
+            service = pending.pop()
+            if service not in graph:
+                graph[service] = list(self.services_with_dependencies.get(service, []))
+                pending.extend(graph[service])
+
+        return self.run_service_graph(collection_path, environment, graph, max_workers, progress)
+
+    def order_services(self, graph):
+        """Topologically sort services so each one comes after its prerequisites"""
+        remaining = {service: len(prerequisites) for service, prerequisites in graph.items()}
+        dependents = {service: [] for service in graph}
+        for service, prerequisites in graph.items():
+            for prerequisite in prerequisites:
+                dependents[prerequisite].append(service)
+
+        ready = [service for service in graph if remaining[service] == 0]
+        order = []
+        while ready:
+            service = ready.pop(0)
+            order.append(service)
+            for dependent in dependents[service]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+
+        if len(order) != len(graph):
+            cycle = sorted(service for service, count in remaining.items() if count > 0)
+            raise ValueError(f"Circular service dependencies: {', '.join(cycle)}")
+        return order
+
+    def run_service_graph(self, collection_path, environment, graph, max_workers=None, progress=None):
+        """Start each service as soon as its prerequisites pass and skip it if one fails"""
+        try:
+            order = self.order_services(graph)
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+
+        max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(order)))
+        results = {}
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while len(results) < len(order):
+                # Walking in topological order lets a skip cascade to every downstream service at once
+                for service in order:
+                    if service in results or service in running.values():
+                        continue
+                    failed = [p for p in graph[service] if p in results and not results[p].get('success')]
+                    if failed:
+                        results[service] = {
+                            "success": False,
+                            "skipped": True,
+                            "error": f"Skipped because {', '.join(failed)} did not pass"
+                        }
+                    elif all(p in results for p in graph[service]):
+                        future = executor.submit(
+                            self.run_newman_command, collection_path, environment, service, progress
+                        )
+                        running[future] = service
+
+                if running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        results[running.pop(future)] = future.result()
+
+        return self.merge_folder_results([(service, results[service]) for service in order])
+
+    def merge_folder_results(self, folder_results):
+        """Combine per-folder run results into one result with a merged report"""
+        completed = [(folder, result) for folder, result in folder_results if result.get('json_data')]
+        errors = [f"{folder}: {result['error']}" for folder, result in folder_results if result.get('error')]
+
+        if not completed:
+            return {"success": False, "error": "; ".join(errors) or "No test results were produced"}
+
+        merged_data = self.merge_json_reports(completed)
+
+        run_id = self.reports.new_run_id()
+        report_path, json_report_path = self.reports.report_paths(run_id)
+
+        with open(json_report_path, 'w') as f:
+            json.dump(merged_data, f)
+        self.generate_html_report(merged_data, report_path)
+
+        merged_results = {
+            "run_id": run_id,
+            "success": all(result.get('success') for _, result in folder_results),
+            "html_report": report_path,
+            "json_report": json_report_path,
+            "json_data": merged_data,
+            "folder_results": {
+                folder: {key: value for key, value in result.items() if key != 'json_data'}
+                for folder, result in folder_results
+            },
+            "mock": any(result.get('mock') for _, result in completed)
+        }
+        if errors:
+            merged_results["error"] = "; ".join(errors)
+        return merged_results
+
+    def merge_json_reports(self, folder_reports):
+        """Merge Newman JSON reports, summing stats and concatenating executions"""
+        stats = {key: {"total": 0, "pending": 0, "failed": 0} for key in ("tests", "assertions", "requests")}
+        executions = []
+        response_sum = 0
+        response_count = 0
+        response_min = None
+        response_max = None
+
+        for folder, result in folder_reports:
+            run = result['json_data']['run']
+
+            for key, counts in run.get('stats', {}).items():
+                bucket = stats.setdefault(key, {})
+                for name, value in counts.items():
+                    bucket[name] = bucket.get(name, 0) + value
+
+            folder_executions = run.get('executions', [])
+            for execution in folder_executions:
+                # Remember which folder produced each execution once they are mixed together
+                execution.setdefault('folder', folder)
+                executions.append(execution)
+
+            timings = run.get('timings', {})
+            if 'responseAverage' in timings and folder_executions:
+                response_sum += timings['responseAverage'] * len(folder_executions)
+                response_count += len(folder_executions)
+            if 'responseMin' in timings:
+                response_min = timings['responseMin'] if response_min is None else min(response_min, timings['responseMin'])
+            if 'responseMax' in timings:
+                response_max = timings['responseMax'] if response_max is None else max(response_max, timings['responseMax'])
+
+        return {
+            "run": {
+                "stats": stats,
+                "timings": {
+                    "responseAverage": round(response_sum / response_count) if response_count else 0,
+                    "responseMin": response_min or 0,
+                    "responseMax": response_max or 0
+                },
+                "executions": executions
+            }
+        }
+
+    def generate_mock_results(self, report_path, progress=None):
+        """Generate mock test results for demonstration"""
+        mock_data = SyntheticRun(**self.mock_settings).build()
+
+        if progress:
+            progress.expect(len(mock_data["run"]["executions"]))
+            for execution in mock_data["run"]["executions"]:
+                progress.record(
+                    execution["item"]["name"],
+                    not any(assertion["error"] for assertion in execution["assertions"])
+                )
+
+        # Generate mock HTML and JSON reports
+        self.generate_html_report(mock_data, report_path)
+        json_report_path = os.path.splitext(report_path)[0] + ".json"
+        with open(json_report_path, 'w') as f:
+            json.dump(mock_data, f)
+
+        return {
+            "success": True,
+            "html_report": report_path,
+            "json_report": json_report_path,
+            "json_data": mock_data,
+            "mock": True
+        }
+
+    def generate_html_report(self, json_data, report_path):
+        """Generate HTML report from JSON data, streaming the execution rows to disk"""
+        started = time.perf_counter()
+        stats = json_data["run"]["stats"]
+        executions = json_data["run"].get("executions", [])
+        now = datetime.datetime.now()
+
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(REPORT_HEAD.substitute(
+                generated=now.strftime('%Y-%m-%d %H:%M:%S'),
+                total=stats['tests']['total'],
+                passed=stats['tests']['total'] - stats['tests']['failed'] - stats['tests']['pending'],
+                failed=stats['tests']['failed'],
+                pending=stats['tests']['pending'],
+                total_requests=stats['requests']['total'],
+                failed_requests=stats['requests']['failed'],
+                total_assertions=stats['assertions']['total'],
+                failed_assertions=stats['assertions']['failed'],
+                latency_chart=self.render_latency_svg(executions)
+            ))
+
+            # One compact JSON array per row; the page renders them a page at a time
+            for execution in executions:
+                response = execution.get('response', {})
+                errors = [
+                    assertion['error'].get('message', '') for assertion in execution.get('assertions', [])
+                    if assertion.get('error')
+                ]
+                row = [
+                    execution['item']['name'],
+                    "FAILED" if errors else "PASSED",
+                    response.get('code', 0),
+                    response.get('responseTime', 0),
+                    errors
+                ]
+                # Escape "</" so a test name can never close the script element
+                f.write(json.dumps(row).replace("</", "<\\/") + ",\n")
+
+            f.write(REPORT_TAIL.substitute(year=now.year))
+
+        self.timer.add("html_report", time.perf_counter() - started)
+
+    def render_latency_svg(self, executions, bins=30, width=1100, height=180):
+        """Render an inline SVG histogram of response times"""
+        import numpy as np
+
+        times = np.fromiter(
+            (execution.get('response', {}).get('responseTime', 0) or 0 for execution in executions),
+            dtype=float,
+            count=len(executions)
+        )
+        if not len(times):
+            return "<p>No executions recorded.</p>"
+
+        counts, edges = np.histogram(times, bins=bins)
+        bar_width = width / len(counts)
+        tallest = counts.max() or 1
+        bars = []
+        for i, count in enumerate(counts):
+            bar_height = (height - 20) * count / tallest
+            bars.append(
+                f'<rect x="{i * bar_width + 1:.1f}" y="{height - 20 - bar_height:.1f}" '
+                f'width="{bar_width - 2:.1f}" height="{bar_height:.1f}" fill="#667eea">'
+                f'<title>{edges[i]:.0f}-{edges[i + 1]:.0f} ms: {count} requests</title></rect>'
+            )
+
+        p50, p95, p99 = np.percentile(times, [50, 95, 99])
+        return (
+            f'<svg viewBox="0 0 {width} {height}" width="100%" role="img">{"".join(bars)}'
+            f'<text x="0" y="{height - 4}" font-size="12">{edges[0]:.0f} ms</text>'
+            f'<text x="{width}" y="{height - 4}" font-size="12" text-anchor="end">{edges[-1]:.0f} ms</text></svg>'
+            f'<p>p50 {p50:.0f} ms &middot; p95 {p95:.0f} ms &middot; p99 {p99:.0f} ms</p>'
+        )
+
+    def send_email_report(self, report_path, recipient_email, smtp_config, compression=None, mail_pool=None):
+        """Send HTML report via email"""
+        try:
+            recipients = parse_recipients(recipient_email)
+            with self.timer.phase("email_encode"):
+                msg = self.build_email_message(report_path, recipients, smtp_config, compression)
+
+            # Send email, reusing a pooled connection when one is available; without a pool
+            # nothing is kept idle, so the one-off connection is closed with QUIT after sending
+            with self.timer.phase("email_send"):
+                (mail_pool or SmtpConnectionPool(max_idle=0)).send(smtp_config, msg, recipients)
+
+            return True, f"Email sent successfully to {len(recipients)} recipient(s)!"
+
+        except Exception as e:
+            return False, f"Failed to send email: {str(e)}"
+
+    def build_email_message(self, report_path, recipients, smtp_config, compression=None):
+        """Build the report email for all recipients, optionally compressing the attachment"""
+        from email import encoders
+        from email.mime.base import MIMEBase
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+
+        msg = MIMEMultipart()
+        msg['From'] = smtp_config['sender_email']
+        msg['To'] = ", ".join(recipients)
+        msg['Subject'] = f"Test Execution Report - {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+
+        # Email body
+        body = """
+        Hello,
+
+        Please find attached the test execution report.
+
+        Summary:
+        - Report generated successfully
+        - Timestamp: {}
+
+        Best regards,
+        Test Automation Team
+        """.format(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+
+        msg.attach(MIMEText(body, 'plain'))
+
+        # Attach HTML report
+        with open(report_path, "rb") as attachment:
+            data = attachment.read()
+        filename = os.path.basename(report_path)
+
+        if compression == "auto":
+            compression = "gzip" if len(data) > AUTO_COMPRESS_BYTES else None
+        if compression == "gzip":
+            data = gzip.compress(data)
+            filename += ".gz"
+            part = MIMEBase('application', 'gzip')
+        elif compression == "zip":
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr(filename, data)
+            data = buffer.getvalue()
+            filename = os.path.splitext(filename)[0] + ".zip"
+            part = MIMEBase('application', 'zip')
+        else:
+            part = MIMEBase('application', 'octet-stream')
+
+        part.set_payload(data)
+        encoders.encode_base64(part)
+        part.add_header('Content-Disposition', f'attachment; filename= {filename}')
+        msg.attach(part)
+        return msg
+
+class SmtpConnectionPool:
+    """Reusable authenticated SMTP connections, keyed by server, port, sender and password"""
+
+    def __init__(self, max_idle=2, timeout=30):
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.idle = {}
+
+    def key(self, smtp_config):
+        # The password is part of the key so a shared pool never hands a logged-in connection
+        # to a session that did not supply the same credentials
+        password = hashlib.sha256((smtp_config.get('sender_password') or "").encode()).hexdigest()
+        return smtp_config['smtp_server'], int(smtp_config['smtp_port']), smtp_config['sender_email'], password
+
+    def connect(self, smtp_config):
+        import smtplib
+        import ssl
+        context = ssl.create_default_context()
+        port = int(smtp_config['smtp_port'])
+        if port == 465:
+            server = smtplib.SMTP_SSL(smtp_config['smtp_server'], port, timeout=self.timeout, context=context)
+            server.ehlo()
+        else:
+            server = smtplib.SMTP(smtp_config['smtp_server'], port, timeout=self.timeout)
+            server.ehlo()
+            if server.has_extn('starttls'):
+                server.starttls(context=context)
+                server.ehlo()
+            elif smtp_config.get('sender_password'):
+                # Never send credentials in the clear; only local debugging servers without a login may skip TLS
+                self.close(server)
+                raise smtplib.SMTPNotSupportedError(
+                    f"{smtp_config['smtp_server']} does not offer STARTTLS, refusing to send the password unencrypted"
+                )
+        if smtp_config.get('sender_password'):
+            server.login(smtp_config['sender_email'], smtp_config['sender_password'])
+        return server
+
+    def acquire(self, smtp_config):
+        import smtplib
+        with self.lock:
+            idle = self.idle.get(self.key(smtp_config), [])
+            server = idle.pop() if idle else None
+
+        if server is not None:
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.close(server)
+        return self.connect(smtp_config)
+
+    def release(self, smtp_config, server):
+        with self.lock:
+            idle = self.idle.setdefault(self.key(smtp_config), [])
+            if len(idle) < self.max_idle:
+                idle.append(server)
+                return
+        self.close(server)
+
+    def close(self, server):
+        import smtplib
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def send(self, smtp_config, msg, recipients):
+        """Send one message to every recipient over a pooled connection"""
+        server = self.acquire(smtp_config)
+        try:
+            server.send_message(msg, to_addrs=recipients)
+        except Exception:
+            # A connection that failed mid-send is not safe to reuse
+            self.close(server)
+            raise
+        self.release(smtp_config, server)
+
+class MailQueue:
+    """Send report emails in the background, retrying transient failures with backoff"""
+
+    def __init__(self, pool, workers=2, max_attempts=4, backoff=2.0, keep_finished=50):
+        self.pool = pool
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.keep_finished = keep_finished
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.pending = queue.Queue()
+        for _ in range(workers):
+            threading.Thread(target=self.work, daemon=True).start()
+
+    def submit(self, dashboard, report_path, recipient_email, smtp_config, compression=None):
+        """Queue a report email and return its job ID"""
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "attempts": 0,
+            "message": "Waiting to send...",
+            "finished": None,
+            "phases": {}
+        }
+        with self.lock:
+            self.jobs[job_id] = job
+        self.pending.put((job, dashboard, report_path, recipient_email, dict(smtp_config), compression))
+        return job_id
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def work(self):
+        while True:
+            job, dashboard, report_path, recipient_email, smtp_config, compression = self.pending.get()
+            job["status"] = "sending"
+            try:
+                recipients = parse_recipients(recipient_email)
+                started = time.perf_counter()
+                msg = dashboard.build_email_message(report_path, recipients, smtp_config, compression)
+                job["phases"]["email_encode"] = time.perf_counter() - started
+                started = time.perf_counter()
+                self.send_with_retry(job, smtp_config, msg, recipients)
+                job["phases"]["email_send"] = time.perf_counter() - started
+                job["status"] = "sent"
+                job["message"] = f"Email sent successfully to {len(recipients)} recipient(s)!"
+            except Exception as e:
+                job["status"] = "failed"
+                job["message"] = f"Failed to send email: {str(e)}"
+            job["finished"] = datetime.datetime.now()
+            self.prune()
+
+    def send_with_retry(self, job, smtp_config, msg, recipients):
+        import smtplib
+        while True:
+            job["attempts"] += 1
+            try:
+                self.pool.send(smtp_config, msg, recipients)
+                return
+            except (smtplib.SMTPAuthenticationError, smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused):
+                # Retrying cannot fix bad credentials or addresses
+                raise
+            except (smtplib.SMTPException, OSError) as e:
+                if job["attempts"] >= self.max_attempts:
+                    raise
+                delay = self.backoff * 2 ** (job["attempts"] - 1)
+                job["message"] = f"Attempt {job['attempts']} failed ({e}); retrying in {delay:.0f}s"
+                time.sleep(delay)
+
+    def prune(self):
+        """Forget the oldest finished jobs beyond the retention limit"""
+        with self.lock:
+            finished = sorted(
+                (job for job in self.jobs.values() if job["finished"]), key=lambda job: job["finished"]
+            )
+            for job in finished[:max(0, len(finished) - self.keep_finished)]:
+                del self.jobs[job["id"]]
+
+class RunHistory:
+    """SQLite store of past runs and their executions for trend queries"""
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS runs (
+            run_id TEXT PRIMARY KEY,
+            started_at TEXT NOT NULL,
+            execution_type TEXT,
+            success INTEGER,
+            total_tests INTEGER,
+            failed_tests INTEGER,
+            pending_tests INTEGER,
+            total_assertions INTEGER,
+            failed_assertions INTEGER,
+            response_average REAL,
+            json_report TEXT
+        );
+        CREATE TABLE IF NOT EXISTS executions (
+            run_id TEXT NOT NULL REFERENCES runs(run_id),
+            started_at TEXT NOT NULL,
+            service TEXT,
+            test_name TEXT,
+            status_code INTEGER,
+            response_time REAL,
+            assertions INTEGER,
+            failed_assertions INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS idx_runs_started_at ON runs(started_at);
+        CREATE INDEX IF NOT EXISTS idx_executions_service ON executions(service, started_at);
+        CREATE INDEX IF NOT EXISTS idx_executions_test_name ON executions(test_name, started_at);
+        CREATE INDEX IF NOT EXISTS idx_executions_run ON executions(run_id);
+        CREATE TABLE IF NOT EXISTS failure_clusters (
+            run_id TEXT NOT NULL REFERENCES runs(run_id),
+            started_at TEXT NOT NULL,
+            cluster_id TEXT NOT NULL,
+            signature TEXT,
+            service TEXT,
+            status_code INTEGER,
+            occurrences INTEGER,
+            example TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_failure_clusters_cluster ON failure_clusters(cluster_id, started_at);
+        CREATE INDEX IF NOT EXISTS idx_failure_clusters_run ON failure_clusters(run_id);
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        with self.connect() as conn:
+            conn.executescript(self.schema)
+
+    def connect(self):
+        # A connection per call keeps the store safe to use from job threads
+        return contextlib.closing(sqlite3.connect(self.db_path, timeout=30))
+
+    def record_run(self, run_id, started_at, execution_type, results):
+        """Store a run's stats and one row per execution"""
+        run = results['json_data']['run']
+        stats = run['stats']
+        started = started_at.isoformat(timespec='seconds')
+
+        rows = []
+        for execution in run.get('executions', []):
+            assertions = execution.get('assertions', [])
+            response = execution.get('response', {})
+            rows.append((
+                run_id,
+                started,
+                execution.get('folder'),
+                execution['item']['name'],
+                response.get('code', 0),
+                response.get('responseTime', 0),
+                len(assertions),
+                sum(1 for assertion in assertions if assertion.get('error'))
+            ))
+
+        with self.connect() as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    started,
+                    execution_type,
+                    int(bool(results.get('success'))),
+                    stats['tests']['total'],
+                    stats['tests']['failed'],
+                    stats['tests']['pending'],
+                    stats['assertions']['total'],
+                    stats['assertions']['failed'],
+                    run.get('timings', {}).get('responseAverage', 0),
+                    results.get('json_report')
+                )
+            )
+            conn.executemany("INSERT INTO executions VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def record_clusters(self, run_id, started_at, clusters):
+        """Index a run's failure clusters so recurring root causes can be found across runs"""
+        started = started_at.isoformat(timespec='seconds')
+        with self.connect() as conn, conn:
+            conn.execute("DELETE FROM failure_clusters WHERE run_id = ?", (run_id,))
+            conn.executemany(
+                "INSERT INTO failure_clusters VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (run_id, started, cluster['cluster_id'], cluster['signature'], cluster['service'],
+                     cluster['status_code'], cluster['occurrences'], cluster['example'])
+                    for cluster in clusters
+                ]
+            )
+
+    def delete_runs(self, run_ids):
+        """Remove expired runs together with their executions and failure clusters"""
+        rows = [(run_id,) for run_id in run_ids]
+        with self.connect() as conn, conn:
+            for table in ("executions", "failure_clusters", "runs"):
+                conn.executemany(f"DELETE FROM {table} WHERE run_id = ?", rows)
+
+    def delete_before(self, started_at):
+        """Remove every run older than the cutoff, including runs whose reports were never indexed"""
+        cutoff = started_at.isoformat(timespec='seconds')
+        with self.connect() as conn:
+            run_ids = [run_id for (run_id,) in conn.execute("SELECT run_id FROM runs WHERE started_at < ?", (cutoff,))]
+        self.delete_runs(run_ids)
+
+    def cluster_history(self, cluster_ids):
+        """Runs, first and last sighting and total occurrences of each cluster"""
+        if not cluster_ids:
+            return {}
+        with self.connect() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT cluster_id, COUNT(DISTINCT run_id), MIN(started_at), MAX(started_at), SUM(occurrences)
+                FROM failure_clusters WHERE cluster_id IN ({', '.join('?' * len(cluster_ids))})
+                GROUP BY cluster_id
+                """,
+                list(cluster_ids)
+            ).fetchall()
+
+        return {
+            cluster_id: {"runs": runs, "first_seen": first_seen, "last_seen": last_seen, "occurrences": occurrences}
+            for cluster_id, runs, first_seen, last_seen, occurrences in rows
+        }
+
+    def run_trend(self, limit=500):
+        """Pass rate and average latency of the most recent runs, oldest first"""
+        with self.connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT run_id, started_at, total_tests, failed_tests, pending_tests, response_average
+                FROM runs ORDER BY started_at DESC LIMIT ?
+                """,
+                (limit,)
+            ).fetchall()
+
+        return [
+            {
+                "run_id": run_id,
+                "started_at": started_at,
+                "pass_rate": 100.0 * (total - failed - pending) / total if total else 0.0,
+                "response_average": response_average
+            }
+            for run_id, started_at, total, failed, pending, response_average in reversed(rows)
+        ]
+
+    def service_trend(self, service, limit=500):
+        """Per-run pass rate and average latency for one service, oldest first"""
+        with self.connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT run_id, started_at, COUNT(*), SUM(failed_assertions = 0), AVG(response_time)
+                FROM executions WHERE service = ?
+                GROUP BY run_id ORDER BY started_at DESC LIMIT ?
+                """,
+                (service, limit)
+            ).fetchall()
+
+        return [
+            {
+                "run_id": run_id,
+                "started_at": started_at,
+                "pass_rate": 100.0 * passed / total if total else 0.0,
+                "response_average": response_average
+            }
+            for run_id, started_at, total, passed, response_average in reversed(rows)
+        ]
+
+    def test_names(self, service=None):
+        """Every test name in the history, optionally only those of one service"""
+        with self.connect() as conn:
+            if service:
+                rows = conn.execute(
+                    "SELECT DISTINCT test_name FROM executions WHERE service = ? ORDER BY test_name", (service,)
+                )
+            else:
+                rows = conn.execute("SELECT DISTINCT test_name FROM executions ORDER BY test_name")
+            return [name for (name,) in rows if name]
+
+    def test_trend(self, test_name, limit=500, service=None):
+        """Status and latency of one test across its most recent runs, oldest first"""
+        with self.connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT run_id, started_at, status_code, response_time, failed_assertions
+                FROM executions WHERE test_name = ? AND (? IS NULL OR service = ?)
+                ORDER BY started_at DESC LIMIT ?
+                """,
+                (test_name, service, service, limit)
+            ).fetchall()
+
+        return [
+            {
+                "run_id": run_id,
+                "started_at": started_at,
+                "status_code": status_code,
+                "response_time": response_time,
+                "passed": failed_assertions == 0
+            }
+            for run_id, started_at, status_code, response_time, failed_assertions in reversed(rows)
+        ]
+
+class ReportStore:
+    """Name, index, compress and expire the report files of each run"""
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS report_files (
+            path TEXT PRIMARY KEY,
+            run_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            size_bytes INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS idx_report_files_run ON report_files(run_id);
+        CREATE INDEX IF NOT EXISTS idx_report_files_kind ON report_files(kind, created_at);
+        CREATE TABLE IF NOT EXISTS result_fingerprints (
+            fingerprint TEXT PRIMARY KEY,
+            json_report TEXT NOT NULL,
+            html_report TEXT,
+            success INTEGER NOT NULL,
+            finished_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, reports_path, db_path, max_runs=200, max_age_days=30, max_total_mb=1024,
+                 keep_uncompressed=10):
+        self.reports_path = reports_path
+        self.db_path = db_path
+        self.max_runs = max_runs
+        self.max_age_days = max_age_days
+        self.max_total_mb = max_total_mb
+        self.keep_uncompressed = keep_uncompressed
+        with self.connect() as conn:
+            conn.executescript(self.schema)
+
+    def connect(self):
+        return contextlib.closing(sqlite3.connect(self.db_path, timeout=30))
+
+    def new_run_id(self):
+        """Microsecond timestamp plus a random suffix: sorts by start time and never collides"""
+        return f"{datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{uuid.uuid4().hex[:4]}"
+
+    def report_paths(self, run_id, label=None):
+        """HTML and JSON report paths for a run, or for one labelled part of it"""
+        name = f"report_{run_id}_{slugify(label)}" if label else f"report_{run_id}"
+        return os.path.join(self.reports_path, f"{name}.html"), os.path.join(self.reports_path, f"{name}.json")
+
+    def register_run(self, results):
+        """Index a finished run's reports together with its per-folder parts"""
+        parts = [
+            path for result in results.get('folder_results', {}).values()
+            for path in (result.get('html_report'), result.get('json_report'))
+        ]
+        # Mock reports are indexed so retention removes them, but never listed as runs to compare
+        prefix = "mock" if results.get('mock') else "run"
+        self.attach(results['run_id'], [results.get('json_report')], kind=f"{prefix}_json")
+        self.attach(results['run_id'], [results.get('html_report')], kind=f"{prefix}_html")
+        self.attach(results['run_id'], parts + results.get('artifacts', []))
+
+    def attach(self, run_id, paths, kind="part"):
+        created_at = datetime.datetime.now().isoformat(timespec='seconds')
+        rows = [
+            (path, run_id, kind, created_at, os.path.getsize(path))
+            for path in paths if path and os.path.exists(path)
+        ]
+        with self.connect() as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO report_files VALUES (?, ?, ?, ?, ?)", rows)
+
+    def remember(self, fingerprint, results):
+        """Keep a result's reports findable by the fingerprint of its inputs"""
+        with self.connect() as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO result_fingerprints VALUES (?, ?, ?, ?, ?)",
+                (fingerprint, results['json_report'], results.get('html_report'), int(bool(results.get('success'))),
+                 time.time())
+            )
+
+    def recall(self, fingerprint, max_age_seconds):
+        """The newest result for a fingerprint if it is recent enough and its reports still exist"""
+        with self.connect() as conn:
+            row = conn.execute(
+                "SELECT json_report, html_report, success, finished_at FROM result_fingerprints "
+                "WHERE fingerprint = ? AND finished_at >= ?",
+                (fingerprint, time.time() - max_age_seconds)
+            ).fetchone()
+        if not row:
+            return None
+
+        def existing(path):
+            # Retention may have gzipped the report since
+            for candidate in (path, f"{path}.gz"):
+                if candidate and os.path.exists(candidate):
+                    return candidate
+            return None
+
+        json_report = existing(row[0])
+        if not json_report:
+            return None
+        return {"json_report": json_report, "html_report": existing(row[1]), "success": bool(row[2]),
+                "finished_at": row[3]}
+
+    def run_reports(self, limit=None):
+        """(run ID, JSON report path) of the most recent runs, oldest first"""
+        with self.connect() as conn:
+            rows = conn.execute(
+                "SELECT run_id, path FROM report_files WHERE kind = 'run_json' ORDER BY run_id DESC LIMIT ?",
+                (limit or -1,)
+            ).fetchall()
+        return list(reversed(rows))
+
+    def usage(self):
+        """Number of indexed runs and their total size on disk"""
+        with self.connect() as conn:
+            runs, total = conn.execute(
+                "SELECT COUNT(DISTINCT run_id), COALESCE(SUM(size_bytes), 0) FROM report_files"
+            ).fetchone()
+        return runs, total
+
+    def apply_retention(self):
+        """Gzip all but the newest runs, then delete runs beyond the count, age and size limits"""
+        with self.connect() as conn:
+            runs = conn.execute(
+                "SELECT run_id, MIN(created_at), SUM(size_bytes) FROM report_files GROUP BY run_id ORDER BY run_id DESC"
+            ).fetchall()
+
+        cutoff = (datetime.datetime.now() - datetime.timedelta(days=self.max_age_days)).isoformat(timespec='seconds')
+        budget = self.max_total_mb * 1024 * 1024
+        total = 0
+        expired = []
+        for position, (run_id, created_at, size) in enumerate(runs):
+            total += size or 0
+            if position >= self.max_runs or created_at < cutoff or (position > 0 and total > budget):
+                expired.append(run_id)
+            elif position >= self.keep_uncompressed:
+                self.compress_run(run_id)
+
+        for run_id in expired:
+            self.delete_run(run_id)
+        return expired
+
+    def compress_run(self, run_id):
+        with self.connect() as conn:
+            paths = [
+                path for (path,) in conn.execute(
+                    "SELECT path FROM report_files WHERE run_id = ? AND kind != 'dataset'", (run_id,)
+                )
+                if not path.endswith('.gz')
+            ]
+
+        for path in paths:
+            compressed_path = f"{path}.gz"
+            try:
+                with open(path, 'rb') as source, gzip.open(compressed_path, 'wb') as target:
+                    shutil.copyfileobj(source, target)
+                os.remove(path)
+            except OSError:
+                continue
+            with self.connect() as conn, conn:
+                conn.execute(
+                    "UPDATE report_files SET path = ?, size_bytes = ? WHERE path = ?",
+                    (compressed_path, os.path.getsize(compressed_path), path)
+                )
+
+    def delete_run(self, run_id):
+        with self.connect() as conn, conn:
+            rows = conn.execute("SELECT path, kind FROM report_files WHERE run_id = ?", (run_id,)).fetchall()
+            for path, kind in rows:
+                with contextlib.suppress(OSError):
+                    os.remove(path)
+                    if kind == "dataset":
+                        # Drop the run_date/service partition directories once they are empty
+                        os.removedirs(os.path.dirname(path))
+            conn.execute("DELETE FROM report_files WHERE run_id = ?", (run_id,))
+
+class RunComparator:
+    """Line up tests by item name across recent run reports to find regressions and flaky tests"""
+
+    def __init__(self, reports_path, load_report, list_reports, keep_runs=50):
+        self.reports_path = reports_path
+        self.index_path = os.path.join(reports_path, "comparison_index.json")
+        self.load_report = load_report
+        self.list_reports = list_reports
+        self.keep_runs = keep_runs
+        self.lock = threading.Lock()
+        self.cached = None  # (runs in the window and thresholds, comparison)
+        try:
+            with open(self.index_path, 'r') as f:
+                self.runs = json.load(f)
+        except (OSError, ValueError):
+            self.runs = {}
+
+    def summarize_report(self, json_report_path):
+        """Reduce a report to pass/fail and mean latency per test name"""
+        tests = {}
+        for execution in self.load_report(json_report_path)['run']['executions']:
+            passed = not any(assertion.get('error') for assertion in execution['assertions'])
+            entry = tests.setdefault(execution['item']['name'], [True, 0.0, 0])
+            entry[0] = entry[0] and passed
+            entry[1] += execution['response']['responseTime'] or 0
+            entry[2] += 1
+        return {name: [passed, total / count] for name, (passed, total, count) in tests.items()}
+
+    def update(self):
+        """Summarize only the run reports that are not in the index yet"""
+        with self.lock:
+            reports = dict(self.list_reports(self.keep_runs))
+            recent = sorted(reports)
+            added = [run_id for run_id in recent if run_id not in self.runs]
+
+            for run_id in added:
+                try:
+                    self.runs[run_id] = self.summarize_report(reports[run_id])
+                except (OSError, ValueError):
+                    self.runs[run_id] = {}
+
+            stale = [name for name in self.runs if name not in recent]
+            for name in stale:
+                del self.runs[name]
+
+            if added or stale:
+                with open(self.index_path, 'w') as f:
+                    json.dump(self.runs, f)
+
+    def compare(self, window=10, min_history=3, z_threshold=3.0, min_increase=0.2):
+        """Compare the latest run with the previous runs in the window, reusing the result until a run is added"""
+        self.update()
+        with self.lock:
+            names = sorted(self.runs)[-window:]
+            runs = [self.runs[name] for name in names]
+            key = (tuple(names), min_history, z_threshold, min_increase)
+            if self.cached and self.cached[0] == key:
+                return self.cached[1]
+
+        comparison = {"runs": names, "newly_failing": [], "newly_passing": [], "flaky": [], "latency_regressions": []}
+        if len(runs) >= 2:
+            self.compare_runs(runs, comparison, min_history, z_threshold, min_increase)
+        with self.lock:
+            self.cached = (key, comparison)
+        return comparison
+
+    def compare_runs(self, runs, comparison, min_history, z_threshold, min_increase):
+        """Fill in the comparison from one test name x run frame instead of looping per test"""
+        import pandas as pd
+
+        # Rows are test names, columns are runs oldest first; a test missing from a run is NaN there
+        frames = [pd.DataFrame.from_dict(run, orient='index', columns=["passed", "latency"]) for run in runs]
+        tests = pd.concat(frames, keys=range(len(runs)), names=["run", "name"]).astype(float).unstack("run")
+        passed, latency = tests['passed'], tests['latency']
+        last = len(runs) - 1
+
+        if last in passed and last - 1 in passed:
+            latest, previous = passed[last], passed[last - 1]
+            comparison["newly_failing"] = sorted(passed.index[(previous == 1) & (latest == 0)])
+            comparison["newly_passing"] = sorted(passed.index[(previous == 0) & (latest == 1)])
+
+        # One-sided z-test of the latest latency against each test's earlier runs
+        if last in latency:
+            baseline = latency.drop(columns=last)
+            mean, std = baseline.mean(axis=1), baseline.std(axis=1, ddof=1)
+            z = (latency[last] - mean) / std
+            regressed = (
+                (baseline.count(axis=1) >= min_history) & (std > 0)
+                & (latency[last] > mean * (1 + min_increase)) & (z > z_threshold)
+            )
+            comparison["latency_regressions"] = [
+                {"Test Name": name, "Baseline (ms)": round(base, 1), "Latest (ms)": round(now, 1), "Z-Score": round(score, 1)}
+                for name, base, now, score in zip(
+                    regressed.index[regressed], mean[regressed].tolist(), latency[last][regressed].tolist(),
+                    z[regressed].tolist()
+                )
+            ]
+
+        # A test is flaky when its outcome flips more than once; runs it is missing from are skipped over
+        previous = passed.ffill(axis=1).shift(axis=1)
+        flips = (passed.notna() & previous.notna() & (passed != previous)).sum(axis=1)
+        pass_rate = passed.mean(axis=1)
+        flaky = flips >= 2
+        comparison["flaky"] = [
+            {"Test Name": name, "Flips": count, "Pass Rate (%)": round(100.0 * rate, 1)}
+            for name, count, rate in zip(passed.index[flaky], flips[flaky].tolist(), pass_rate[flaky].tolist())
+        ]
+
+        comparison["flaky"].sort(key=lambda row: row["Flips"], reverse=True)
+        comparison["latency_regressions"].sort(key=lambda row: row["Z-Score"], reverse=True)
+
+class ResultCache:
+    """Size-bounded LRU cache of values derived from report files, keyed by path and mtime"""
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, max_entries=64):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+
+    def get(self, path, kind, build):
+        """Return the cached value for this version of the file, building it on a miss"""
+        try:
+            key = (kind, os.path.abspath(path), os.stat(path).st_mtime_ns)
+        except (TypeError, OSError):
+            return build()
+
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key][0]
+
+        value = build()
+        size = self.estimate_size(value)
+
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = (value, size)
+                self.total_bytes += size
+            # Evict least recently used entries, always keeping the newest one
+            while len(self.entries) > 1 and (
+                self.total_bytes > self.max_bytes or len(self.entries) > self.max_entries
+            ):
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+        return value
+
+    def estimate_size(self, value):
+        # Nothing can be a DataFrame or Figure unless pandas or plotly was already imported
+        pd = sys.modules.get('pandas')
+        go = sys.modules.get('plotly.graph_objects')
+        if pd and isinstance(value, pd.DataFrame):
+            return int(value.memory_usage(index=True, deep=True).sum())
+        if isinstance(value, (bytes, str)):
+            return len(value)
+        if isinstance(value, (tuple, list)):
+            return sum(self.estimate_size(item) for item in value)
+        if go and isinstance(value, go.Figure):
+            return sum(sys.getsizeof(trace) for trace in value.data) + 4096
+        return sys.getsizeof(value)
+
+class JobQueue:
+    """Background test runs shared by every session, with a global cap on Newman processes"""
+
+    def __init__(self, max_jobs, max_processes, keep_finished=50):
+        self.executor = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix="newman-job")
+        self.process_slots = threading.BoundedSemaphore(max_processes)
+        self.keep_finished = keep_finished
+        self.lock = threading.Lock()
+        self.jobs = {}
+
+    def submit(self, description, func, *args, **kwargs):
+        """Queue func(*args, progress=..., **kwargs) and return its job ID"""
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            "id": job_id,
+            "description": description,
+            "status": "queued",
+            "submitted": datetime.datetime.now(),
+            "finished": None,
+            "progress": RunProgress(),
+            "result": None
+        }
+
+        def run():
+            job["status"] = "running"
+            try:
+                job["result"] = func(*args, progress=job["progress"], **kwargs)
+                job["status"] = "completed"
+            except Exception as e:
+                job["result"] = {"success": False, "error": str(e)}
+                job["status"] = "failed"
+            job["finished"] = datetime.datetime.now()
+            self.prune()
+
+        with self.lock:
+            self.jobs[job_id] = job
+        self.executor.submit(run)
+        return job_id
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def prune(self):
+        """Forget the oldest finished jobs beyond the retention limit"""
+        with self.lock:
+            finished = sorted(
+                (job for job in self.jobs.values() if job["finished"]), key=lambda job: job["finished"]
+            )
+            for job in finished[:max(0, len(finished) - self.keep_finished)]:
+                del self.jobs[job["id"]]
+
+class RunProgress:
+    """Thread-safe live counters shared by every Newman process in a run"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.total = 0
+        self.completed = 0
+        self.passed = 0
+        self.failed = 0
+        self.current = None
+        self.failures = []
+
+    def expect(self, count):
+        with self.lock:
+            self.total += count
+
+    def start(self, name):
+        with self.lock:
+            self.current = name
+
+    def record(self, name, passed):
+        with self.lock:
+            self.completed += 1
+            if passed:
+                self.passed += 1
+            else:
+                self.failed += 1
+                self.failures.append(name)
+
+    def retract(self, records):
+        """Undo recorded requests from a run that was reassigned and will report them again"""
+        with self.lock:
+            for name, passed in records:
+                self.completed -= 1
+                if passed:
+                    self.passed -= 1
+                else:
+                    self.failed -= 1
+                    if name in self.failures:
+                        self.failures.remove(name)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "total": max(self.total, self.completed),
+                "completed": self.completed,
+                "passed": self.passed,
+                "failed": self.failed,
+                "current": self.current,
+                "failures": list(self.failures)
+            }
+
+class NewmanCliParser:
+    """Turn Newman CLI reporter lines into per-request progress updates"""
+
+    request_line = re.compile(r'^(?:→|↳|->)\s+(.*\S)')
+    failed_assertion_line = re.compile(r'^\s{2}\d+\.\s')
+
+    def __init__(self, progress):
+        self.progress = progress
+        self.current = None
+        self.current_failed = False
+        self.finished = False
+
+    def feed(self, line):
+        if not self.progress or self.finished:
+            return
+        # The summary table and failure list follow the last request
+        if line.startswith('┌'):
+            self.close()
+            return
+
+        match = self.request_line.match(line)
+        if match:
+            self.finish_request()
+            self.current = match.group(1)
+            self.current_failed = False
+            self.progress.start(self.current)
+        elif self.current and (self.failed_assertion_line.match(line) or '[errored]' in line):
+            self.current_failed = True
+
+    def finish_request(self):
+        if self.current:
+            self.progress.record(self.current, not self.current_failed)
+            self.current = None
+
+    def close(self):
+        if self.progress and not self.finished:
+            self.finish_request()
+            self.finished = True
+
+class AsyncCollectionRunner:
+    """Run Postman collection requests concurrently over pooled aiohttp connections
+
+    Requests run independently, so collections that pass state between requests
+    (pm.environment.set and friends) still need Newman. Test scripts are matched
+    against common pm.test patterns: status codes, response time, headers and
+    JSON body values. Tests that use anything else are reported as pending.
+    """
+
+    variable_pattern = re.compile(r'{{\s*([^{}]+?)\s*}}')
+    test_pattern = re.compile(
+        r'pm\.test\(\s*([\'"`])(.+?)\1\s*,\s*(?:function\s*\(\s*\)|\(\s*\)\s*=>)\s*\{'
+    )
+    status_pattern = re.compile(r'pm\.response\.to\.have\.status\(\s*(\d+)\s*\)')
+    code_pattern = re.compile(
+        r'pm\.expect\(\s*pm\.response\.code\s*\)\.to\.(?:eql|equal|be\.equal|be\.oneOf)\(\s*(\[[^\]]*\]|\d+)\s*\)'
+    )
+    ok_pattern = re.compile(r'pm\.response\.to\.(?:be|have)\.(?:ok|success)\b')
+    header_pattern = re.compile(r'pm\.response\.to\.have\.header\(\s*([\'"])(.+?)\1\s*\)')
+    json_body_pattern = re.compile(r'pm\.response\.to\.have\.jsonBody\(\s*([\'"])(.+?)\1\s*\)')
+    response_time_pattern = re.compile(
+        r'pm\.expect\(\s*pm\.response\.responseTime\s*\)\.to\.be\.(below|lessThan|above)\(\s*(\d+)\s*\)'
+    )
+    json_value_pattern = re.compile(
+        r'pm\.expect\(\s*(?:pm\.response\.json\(\)|(\w+))([\w.\[\]]*)\s*\)'
+        r'\.to\.(?:eql|equal|deep\.equal|be\.equal)\(\s*(.+?)\s*\)\s*;'
+    )
+    json_alias_pattern = re.compile(r'(?:var|let|const)\s+(\w+)\s*=\s*pm\.response\.json\(\)')
+    missing = object()  # Marks a JSON path or body that is absent
+
+    def __init__(self, collection, environment=None, concurrency=20, timeout=30):
+        self.collection = collection
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.variables = {
+            variable['key']: variable.get('value')
+            for variable in collection.get('variable', []) if not variable.get('disabled')
+        }
+        for variable in (environment or {}).get('values', []):
+            if variable.get('enabled', True):
+                self.variables[variable['key']] = variable.get('value')
+
+    def resolve(self, value):
+        """Substitute {{variables}}, including the common dynamic ones"""
+        if not isinstance(value, str):
+            return value
+
+        def lookup(match):
+            name = match.group(1)
+            if name == '$guid' or name == '$randomUUID':
+                return str(uuid.uuid4())
+            if name == '$timestamp':
+                return str(int(time.time()))
+            if name == '$isoTimestamp':
+                return datetime.datetime.now(datetime.timezone.utc).isoformat()
+            if name == '$randomInt':
+                return str(int.from_bytes(os.urandom(2), 'big') % 1001)
+            if name in self.variables:
+                return str(self.variables[name])
+            return match.group(0)
+
+        for _ in range(5):
+            resolved = self.variable_pattern.sub(lookup, value)
+            if resolved == value:
+                break
+            value = resolved
+        return value
+
+    def requests(self, folder=None):
+        """Yield (item, service, inherited auth) for each request, optionally inside one folder"""
+        collected = []
+
+        def walk(items, service, auth, selected):
+            for item in items:
+                item_auth = item.get('auth') or auth
+                item_selected = selected or folder is None or item.get('name') == folder
+                if 'item' in item:
+                    walk(item['item'], service or item.get('name'), item_auth, item_selected)
+                elif item_selected:
+                    collected.append((item, service, (item.get('request') or {}).get('auth') or item_auth))
+
+        walk(self.collection.get('item', []), None, self.collection.get('auth'), False)
+        return collected
+
+    def build_request(self, item, auth):
+        """Turn a Postman request definition into aiohttp request arguments"""
+        request = item.get('request') or {}
+        if isinstance(request, str):
+            request = {'url': request}
+
+        url = request.get('url', '')
+        if isinstance(url, dict):
+            if url.get('raw'):
+                url = url['raw']
+            else:
+                host = ".".join(url.get('host', [])) if isinstance(url.get('host'), list) else url.get('host', '')
+                path = "/".join(url.get('path', [])) if isinstance(url.get('path'), list) else url.get('path', '')
+                query = "&".join(
+                    f"{q['key']}={q.get('value', '')}" for q in url.get('query', []) if not q.get('disabled')
+                )
+                url = f"{url.get('protocol', 'http')}://{host}/{path}" + (f"?{query}" if query else "")
+
+        headers = {
+            header['key']: self.resolve(header.get('value', ''))
+            for header in request.get('header', []) if not header.get('disabled')
+        }
+
+        if auth and auth.get('type') in ('bearer', 'basic', 'apikey'):
+            values = {entry['key']: self.resolve(entry.get('value')) for entry in auth.get(auth['type'], [])}
+            if auth['type'] == 'bearer':
+                headers.setdefault('Authorization', f"Bearer {values.get('token', '')}")
+            elif auth['type'] == 'basic':
+                token = base64.b64encode(f"{values.get('username', '')}:{values.get('password', '')}".encode())
+                headers.setdefault('Authorization', f"Basic {token.decode()}")
+            elif values.get('in', 'header') == 'header':
+                headers.setdefault(values.get('key', 'X-API-Key'), values.get('value', ''))
+
+        kwargs = {"method": request.get('method', 'GET').upper(), "url": self.resolve(url), "headers": headers}
+
+        body = request.get('body') or {}
+        if body.get('mode') == 'raw' and body.get('raw'):
+            kwargs['data'] = self.resolve(body['raw']).encode('utf-8')
+            language = body.get('options', {}).get('raw', {}).get('language')
+            if language == 'json' and not any(key.lower() == 'content-type' for key in headers):
+                headers['Content-Type'] = 'application/json'
+        elif body.get('mode') in ('urlencoded', 'formdata'):
+            kwargs['data'] = {
+                field['key']: self.resolve(field.get('value', ''))
+                for field in body.get(body['mode'], []) if not field.get('disabled') and field.get('type') != 'file'
+            }
+        return kwargs
+
+    def test_blocks(self, item):
+        """Split an item's test script into (test name, test body) pairs"""
+        script = "\n".join(
+            "\n".join(event['script']['exec']) if isinstance(event['script'].get('exec'), list)
+            else event['script'].get('exec', '')
+            for event in item.get('event', []) if event.get('listen') == 'test' and event.get('script')
+        )
+
+        blocks = []
+        for match in self.test_pattern.finditer(script):
+            depth = 1
+            end = match.end()
+            while end < len(script) and depth:
+                depth += {'{': 1, '}': -1}.get(script[end], 0)
+                end += 1
+            blocks.append((match.group(2), script[match.end():end - 1]))
+        return script, blocks
+
+    def evaluate(self, script, body, response):
+        """Evaluate one pm.test body; return an error message, None on success, or False if unsupported"""
+        checks = 0
+        aliases = set(self.json_alias_pattern.findall(script))
+
+        for match in self.status_pattern.finditer(body):
+            checks += 1
+            if response['code'] != int(match.group(1)):
+                return f"expected response to have status code {match.group(1)} but got {response['code']}"
+
+        for match in self.code_pattern.finditer(body):
+            checks += 1
+            expected = json.loads(match.group(1))
+            allowed = expected if isinstance(expected, list) else [expected]
+            if response['code'] not in allowed:
+                return f"expected {response['code']} to be one of {allowed}"
+
+        for _ in self.ok_pattern.finditer(body):
+            checks += 1
+            if not 200 <= response['code'] < 300:
+                return f"expected response code to be 2XX but found {response['code']}"
+
+        for match in self.header_pattern.finditer(body):
+            checks += 1
+            if match.group(2).lower() not in response['headers']:
+                return f"expected response to have header with key '{match.group(2)}'"
+
+        for match in self.response_time_pattern.finditer(body):
+            checks += 1
+            limit = int(match.group(2))
+            if match.group(1) == 'above' and not response['responseTime'] > limit:
+                return f"expected {response['responseTime']} to be above {limit}"
+            if match.group(1) != 'above' and not response['responseTime'] < limit:
+                return f"expected {response['responseTime']} to be below {limit}"
+
+        for match in self.json_body_pattern.finditer(body):
+            checks += 1
+            if self.json_path(response['json'], match.group(2)) is self.missing:
+                return f"expected response body to have property '{match.group(2)}'"
+
+        for match in self.json_value_pattern.finditer(body):
+            alias, path, literal = match.groups()
+            if alias and alias not in aliases:
+                continue
+            try:
+                expected = json.loads(re.sub(r"^'(.*)'$", lambda m: json.dumps(m.group(1)), literal))
+            except ValueError:
+                continue
+            checks += 1
+            actual = self.json_path(response['json'], path.lstrip('.'))
+            if actual is self.missing or actual != expected:
+                actual = None if actual is self.missing else actual
+                return f"expected {json.dumps(actual)} to deeply equal {json.dumps(expected)}"
+
+        return None if checks else False
+
+    def json_path(self, data, path):
+        """Follow a dotted/indexed path such as 'data.items[0].id' into parsed JSON"""
+        if data is self.missing:
+            return self.missing
+        for key in re.findall(r'[^.\[\]]+', path):
+            if isinstance(data, list) and key.isdigit() and int(key) < len(data):
+                data = data[int(key)]
+            elif isinstance(data, dict) and key in data:
+                data = data[key]
+            else:
+                return self.missing
+        return data
+
+    async def execute(self, session, semaphore, item, service, auth, progress):
+        """Send one request and evaluate its tests into a Newman-shaped execution"""
+        import asyncio
+        import aiohttp
+
+        execution = {"item": {"name": item.get('name')}, "folder": service}
+        script, blocks = self.test_blocks(item)
+
+        async with semaphore:
+            if progress:
+                progress.start(item.get('name'))
+            kwargs = self.build_request(item, auth)
+            execution["request"] = {"method": kwargs['method'], "url": kwargs['url']}
+            started = time.perf_counter()
+            try:
+                async with session.request(**kwargs) as http_response:
+                    content = await http_response.read()
+                    response = {
+                        "code": http_response.status,
+                        "status": http_response.reason,
+                        "responseTime": round((time.perf_counter() - started) * 1000),
+                        "responseSize": len(content),
+                        "headers": {key.lower() for key in http_response.headers}
+                    }
+                try:
+                    response["json"] = json.loads(content)
+                except ValueError:
+                    response["json"] = self.missing
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                execution["requestError"] = {"message": str(e) or type(e).__name__}
+                response = None
+
+        if response is None:
+            execution["response"] = {"code": 0, "responseTime": 0}
+            execution["assertions"] = [
+                {"assertion": name, "error": {"message": execution["requestError"]["message"]}}
+                for name, _ in blocks
+            ]
+        else:
+            execution["response"] = {
+                key: response[key] for key in ("code", "status", "responseTime", "responseSize")
+            }
+            execution["assertions"] = []
+            for name, body in blocks:
+                outcome = self.evaluate(script, body, response)
+                assertion = {"assertion": name, "error": {"message": outcome} if outcome else None}
+                if outcome is False:
+                    assertion["skipped"] = True
+                execution["assertions"].append(assertion)
+
+        if progress:
+            progress.record(item.get('name'), not execution.get("requestError") and not any(
+                assertion["error"] for assertion in execution["assertions"]
+            ))
+        return execution
+
+    async def run(self, folder=None, progress=None):
+        """Run every selected request and return a Newman-shaped JSON report"""
+        import asyncio
+        import aiohttp
+
+        requests = self.requests(folder)
+        if progress:
+            progress.expect(len(requests))
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        started = datetime.datetime.now(datetime.timezone.utc)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            executions = await asyncio.gather(*(
+                self.execute(session, semaphore, item, service, auth, progress) for item, service, auth in requests
+            ))
+
+        times = [execution["response"]["responseTime"] for execution in executions if not execution.get("requestError")]
+        assertions = [assertion for execution in executions for assertion in execution["assertions"]]
+        scripted = [execution for execution in executions if execution["assertions"]]
+
+        return {
+            "run": {
+                "stats": {
+                    "requests": {
+                        "total": len(executions),
+                        "pending": 0,
+                        "failed": sum(1 for execution in executions if execution.get("requestError"))
+                    },
+                    "tests": {
+                        "total": len(scripted),
+                        "pending": 0,
+                        "failed": sum(
+                            1 for execution in scripted
+                            if any(assertion["error"] for assertion in execution["assertions"])
+                        )
+                    },
+                    "assertions": {
+                        "total": len(assertions),
+                        "pending": sum(1 for assertion in assertions if assertion.get("skipped")),
+                        "failed": sum(1 for assertion in assertions if assertion["error"])
+                    }
+                },
+                "timings": {
+                    "responseAverage": round(sum(times) / len(times)) if times else 0,
+                    "responseMin": min(times) if times else 0,
+                    "responseMax": max(times) if times else 0,
+                    "started": started.isoformat(),
+                    "completed": datetime.datetime.now(datetime.timezone.utc).isoformat()
+                },
+                "executions": list(executions)
+            }
+        }
+
+class AgentCoordinator:
+    """Hand folder and shard runs to remote agents and collect their streamed results
+
+    Agents poll for work, so only the coordinator needs a reachable port. Every
+    assignment is a lease: when an agent misses its heartbeats or its result
+    stream breaks, the lease is dropped and the task goes back on the queue.
+    """
+
+    LOOPBACK_HOSTS = ("127.0.0.1", "::1", "localhost")
+
+    def __init__(self, port=AGENT_PORT, host=None, token=None, agent_timeout=30, max_attempts=3,
+                 run_timeout=1800):
+        # Without a token anyone who can reach the port could run collections, so only
+        # listen on other interfaces when agents have to authenticate
+        if host is None:
+            host = "0.0.0.0" if token else "127.0.0.1"
+        elif host not in self.LOOPBACK_HOSTS and not token:
+            raise ValueError(f"Refusing to serve agents on {host} without NEWMAN_AGENT_TOKEN")
+        self.port = port
+        self.host = host
+        self.token = token
+        self.agent_timeout = agent_timeout
+        self.max_attempts = max_attempts
+        self.run_timeout = run_timeout
+        self.lock = threading.Condition()
+        self.agents = {}
+        self.tasks = {}
+        self.leases = {}
+        self.pending = deque()
+        self.server = None
+
+    def start(self):
+        """Serve the agent API on a background thread; calling it again is a no-op"""
+        if self.server:
+            return self
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        coordinator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def reply(self, status, payload=None):
+                body = json.dumps(payload).encode() if payload is not None else b""
+                # An agent that died mid-upload is no longer there to read the reply
+                with contextlib.suppress(OSError):
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+            def read_json(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def read_lines(self):
+                """Yield NDJSON lines as they arrive, decoding chunked uploads by hand"""
+                if self.headers.get("Transfer-Encoding", "").lower() != "chunked":
+                    yield from self.rfile.read(int(self.headers.get("Content-Length") or 0)).splitlines()
+                    return
+                buffer = b""
+                while True:
+                    size_line = self.rfile.readline()
+                    size = int(size_line.split(b";")[0].strip() or b"0", 16)
+                    if size == 0:
+                        # A dropped connection also ends up here, without a result event
+                        break
+                    buffer += self.rfile.read(size)
+                    self.rfile.readline()
+                    *lines, buffer = buffer.split(b"\n")
+                    yield from lines
+                if buffer:
+                    yield buffer
+
+            def authorized(self):
+                supplied = self.headers.get("X-Agent-Token") or ""
+                return not coordinator.token or hmac.compare_digest(supplied.encode(), coordinator.token.encode())
+
+            def do_GET(self):
+                if not self.authorized():
+                    return self.reply(403)
+                if self.path == "/agents":
+                    return self.reply(200, coordinator.status())
+                self.reply(404)
+
+            def do_POST(self):
+                if not self.authorized():
+                    return self.reply(403)
+                parts = self.path.strip("/").split("/")
+                try:
+                    if parts == ["agents"]:
+                        payload = self.read_json()
+                        return self.reply(200, {"agent_id": coordinator.register(payload.get("name"))})
+                    if len(parts) == 3 and parts[0] == "agents" and parts[2] == "heartbeat":
+                        return self.reply(200 if coordinator.heartbeat(parts[1]) else 404)
+                    if len(parts) == 3 and parts[0] == "agents" and parts[2] == "next":
+                        if not coordinator.heartbeat(parts[1]):
+                            return self.reply(404)
+                        assignment = coordinator.next_task(parts[1])
+                        return self.reply(200, assignment) if assignment else self.reply(204)
+                    if len(parts) == 3 and parts[0] == "leases" and parts[2] == "results":
+                        accepted = True
+                        for line in self.read_lines():
+                            if line.strip() and not coordinator.handle_event(parts[1], json.loads(line)):
+                                accepted = False
+                                break
+                        coordinator.end_stream(parts[1])
+                        return self.reply(200 if accepted else 409)
+                except (OSError, ValueError) as e:
+                    coordinator.end_stream(parts[-2] if parts[0] == "leases" else None)
+                    return self.reply(400, {"error": str(e)})
+                self.reply(404)
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        threading.Thread(target=self.reap, daemon=True).start()
+        return self
+
+    def register(self, name=None):
+        agent_id = uuid.uuid4().hex[:12]
+        with self.lock:
+            self.agents[agent_id] = {"name": name or agent_id, "last_seen": time.time(), "leases": set(), "done": 0}
+        return agent_id
+
+    def heartbeat(self, agent_id):
+        with self.lock:
+            agent = self.agents.get(agent_id)
+            if agent:
+                agent["last_seen"] = time.time()
+            return agent is not None
+
+    def next_task(self, agent_id, wait_seconds=20):
+        """Long-poll for the next queued task and lease it to the agent"""
+        deadline = time.time() + wait_seconds
+        with self.lock:
+            while True:
+                # An agent the reaper dropped while it waited must leave queued tasks for the live agents
+                while self.pending and agent_id in self.agents:
+                    task = self.tasks.get(self.pending.popleft())
+                    if task and not task["done"].is_set():
+                        lease = uuid.uuid4().hex
+                        task["lease"] = lease
+                        task["agent"] = agent_id
+                        task["attempts"] += 1
+                        self.leases[lease] = task["id"]
+                        self.agents[agent_id]["leases"].add(lease)
+                        self.agents[agent_id]["last_seen"] = time.time()
+                        return {"lease": lease, "task": task["payload"]}
+                remaining = deadline - time.time()
+                if remaining <= 0 or agent_id not in self.agents:
+                    return None
+                self.lock.wait(remaining)
+
+    def handle_event(self, lease, event):
+        """Apply one streamed event; returns False once the lease is no longer valid"""
+        with self.lock:
+            task = self.tasks.get(self.leases.get(lease))
+            if not task or task["lease"] != lease:
+                return False
+            if task["agent"] in self.agents:
+                self.agents[task["agent"]]["last_seen"] = time.time()
+
+            progress = task["progress"]
+            kind = event.get("event")
+            if kind == "expect" and not task["expected"]:
+                # A reassigned task reports its request count again
+                task["expected"] = True
+                if progress:
+                    progress.expect(event["count"])
+            elif kind == "start" and progress:
+                progress.start(event["name"])
+            elif kind == "record":
+                task["records"].append((event["name"], event["passed"]))
+                if progress:
+                    progress.record(event["name"], event["passed"])
+            elif kind == "result":
+                task["result"] = event["result"]
+                self.release(lease)
+                if task["agent"] in self.agents:
+                    self.agents[task["agent"]]["done"] += 1
+                task["done"].set()
+        return True
+
+    def end_stream(self, lease):
+        """A result stream closed; requeue its task if no result came with it"""
+        with self.lock:
+            task = self.tasks.get(self.leases.get(lease))
+            if task and task["lease"] == lease and not task["done"].is_set():
+                self.requeue(task, "the agent's result stream ended early")
+
+    def release(self, lease):
+        task_id = self.leases.pop(lease, None)
+        task = self.tasks.get(task_id)
+        if task:
+            if task["agent"] in self.agents:
+                self.agents[task["agent"]]["leases"].discard(lease)
+            task["lease"] = None
+
+    def requeue(self, task, reason):
+        """Take a task back from its agent (lock held) and retry it elsewhere"""
+        self.release(task["lease"])
+        if task["progress"] and task["records"]:
+            task["progress"].retract(task["records"])
+        task["records"] = []
+
+        if task["attempts"] >= self.max_attempts:
+            task["result"] = {
+                "success": False,
+                "error": f"{task['label']}: gave up after {task['attempts']} agent attempts ({reason})"
+            }
+            task["done"].set()
+        else:
+            self.pending.appendleft(task["id"])
+            self.lock.notify_all()
+
+    def reap(self):
+        """Drop agents that stopped sending heartbeats and requeue whatever they were running"""
+        while True:
+            time.sleep(max(1, self.agent_timeout / 3))
+            with self.lock:
+                cutoff = time.time() - self.agent_timeout
+                for agent_id, agent in list(self.agents.items()):
+                    if agent["last_seen"] >= cutoff:
+                        continue
+                    for lease in list(agent["leases"]):
+                        task = self.tasks.get(self.leases.get(lease))
+                        if task:
+                            self.requeue(task, f"agent {agent['name']} stopped responding")
+                    del self.agents[agent_id]
+                    # Wake its pending long-poll so the dropped agent stops waiting for work
+                    self.lock.notify_all()
+
+    def run(self, collection_path, environment=None, folder=None, progress=None, label=None):
+        """Queue one folder or shard run for the agents and wait for its result"""
+        with open(collection_path, 'r', encoding='utf-8') as f:
+            collection = json.load(f)
+        environment_data = None
+        if environment:
+            with open(environment, 'r', encoding='utf-8') as f:
+                environment_data = json.load(f)
+
+        task_id = uuid.uuid4().hex[:12]
+        task = {
+            "id": task_id,
+            "label": label or folder or "collection",
+            "payload": {"collection": collection, "environment": environment_data, "folder": folder, "label": label},
+            "progress": progress,
+            "attempts": 0,
+            "lease": None,
+            "agent": None,
+            "records": [],
+            "expected": False,
+            "result": None,
+            "done": threading.Event()
+        }
+        with self.lock:
+            self.tasks[task_id] = task
+            self.pending.append(task_id)
+            self.lock.notify_all()
+
+        finished = task["done"].wait(self.run_timeout)
+        with self.lock:
+            if not finished:
+                self.release(task["lease"])
+                task["result"] = {
+                    "success": False,
+                    "error": f"{task['label']}: no agent finished it within {self.run_timeout}s"
+                }
+            del self.tasks[task_id]
+        return task["result"]
+
+    def status(self):
+        with self.lock:
+            now = time.time()
+            return [
+                {
+                    "agent_id": agent_id,
+                    "name": agent["name"],
+                    "running": len(agent["leases"]),
+                    "completed": agent["done"],
+                    "last_seen_seconds": round(now - agent["last_seen"], 1)
+                }
+                for agent_id, agent in self.agents.items()
+            ]
+
+    def queued(self):
+        with self.lock:
+            return len(self.pending)
+
+class AgentProgress:
+    """Progress tracker stand-in that forwards every update to the coordinator as an event"""
+
+    def __init__(self, events):
+        self.events = events
+
+    def expect(self, count):
+        self.events.put({"event": "expect", "count": count})
+
+    def start(self, name):
+        self.events.put({"event": "start", "name": name})
+
+    def record(self, name, passed):
+        self.events.put({"event": "record", "name": name, "passed": passed})
+
+class AgentWorker:
+    """Run coordinator tasks with the local Newman and stream progress and results back as NDJSON"""
+
+    def __init__(self, coordinator_url, name=None, slots=1, token=None, engine="newman", heartbeat_interval=5):
+        import socket
+
+        self.url = coordinator_url.rstrip("/")
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.slots = slots
+        self.token = token
+        self.heartbeat_interval = heartbeat_interval
+        self.dashboard = TestDashboard(engine=engine)
+        self.agent_id = None
+
+    def headers(self):
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["X-Agent-Token"] = self.token
+        return headers
+
+    def post(self, path, payload=None, timeout=60):
+        """POST JSON to the coordinator and return (status, decoded body)"""
+        import urllib.error
+        import urllib.request
+
+        request = urllib.request.Request(
+            self.url + path, data=json.dumps(payload or {}).encode(), headers=self.headers(), method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                body = response.read()
+                return response.status, json.loads(body) if body else None
+        except urllib.error.HTTPError as e:
+            return e.code, None
+
+    def register(self):
+        while True:
+            try:
+                status, data = self.post("/agents", {"name": self.name, "slots": self.slots})
+                if status == 200:
+                    self.agent_id = data["agent_id"]
+                    print(f"Registered with {self.url} as {self.name} ({self.agent_id})", flush=True)
+                    return
+                print(f"Registration refused ({status})", flush=True)
+            except OSError as e:
+                print(f"Coordinator unreachable ({e}); retrying", flush=True)
+            time.sleep(self.heartbeat_interval)
+
+    def heartbeat(self):
+        while True:
+            time.sleep(self.heartbeat_interval)
+            try:
+                if self.post(f"/agents/{self.agent_id}/heartbeat")[0] == 404:
+                    # The coordinator restarted or gave up on this agent
+                    self.register()
+            except OSError:
+                pass
+
+    def serve(self):
+        """Register, then keep `slots` tasks running until interrupted"""
+        self.register()
+        threading.Thread(target=self.heartbeat, daemon=True).start()
+        workers = [threading.Thread(target=self.work, daemon=True) for _ in range(self.slots)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    def work(self):
+        while True:
+            try:
+                status, assignment = self.post(f"/agents/{self.agent_id}/next", timeout=60)
+            except OSError:
+                time.sleep(self.heartbeat_interval)
+                continue
+            if status == 404:
+                self.register()
+            elif status == 200:
+                self.run_task(assignment["lease"], assignment["task"])
+
+    def run_task(self, lease, task):
+        """Run one task and stream its progress and result to the coordinator while it runs"""
+        import tempfile
+        import urllib.request
+
+        events = queue.Queue()
+
+        def body():
+            while True:
+                event = events.get()
+                if event is None:
+                    return
+                yield (json.dumps(event) + "\n").encode()
+
+        def upload():
+            # An iterable body without a length is sent with chunked transfer encoding
+            request = urllib.request.Request(
+                f"{self.url}/leases/{lease}/results", data=body(), headers=self.headers(), method="POST"
+            )
+            try:
+                urllib.request.urlopen(request, timeout=None).close()
+            except OSError as e:
+                print(f"Streaming results for {task['label'] or task['folder']} failed: {e}", flush=True)
+
+        uploader = threading.Thread(target=upload, daemon=True)
+        uploader.start()
 
-# Configure Streamlit page
-st.set_page_config(
-    page_title="Test Execution Dashboard",
-    page_icon="🧪",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+        with tempfile.TemporaryDirectory() as workdir:
+            collection_path = os.path.join(workdir, "collection.json")
+            with open(collection_path, 'w', encoding='utf-8') as f:
+                json.dump(task["collection"], f)
+            environment_path = None
+            if task.get("environment"):
+                environment_path = os.path.join(workdir, "environment.json")
+                with open(environment_path, 'w', encoding='utf-8') as f:
+                    json.dump(task["environment"], f)
 
-# Custom CSS for better styling
-st.markdown("""
-<style>
-    .main-header {
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-        padding: 2rem;
-        border-radius: 10px;
-        color: white;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .metric-card {
-        background: white;
-        padding: 1rem;
-        border-radius: 8px;
-        border-left: 4px solid #667eea;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-    }
-    .success-card {
-        border-left-color: #10b981;
-    }
-    .error-card {
-        border-left-color: #ef4444;
-    }
-    .warning-card {
-        border-left-color: #f59e0b;
-    }
-    .stButton > button {
-        width: 100%;
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        border: none;
-        padding: 0.75rem;
-        border-radius: 8px;
-        font-weight: bold;
-    }
-    .download-btn {
-        background: linear-gradient(90deg, #10b981 0%, #059669 100%) !important;
-    }
-    .email-btn {
-        background: linear-gradient(90deg, #8b5cf6 0%, #7c3aed 100%) !important;
-    }
-</style>
-""", unsafe_allow_html=True)
+            try:
+                result = self.dashboard.run_newman_command(
+                    collection_path, environment_path, task.get("folder"), AgentProgress(events), task.get("label")
+                )
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
 
-class TestDashboard:
-    def __init__(self):
-        self.collections_path = "collections/"  # Path to your Postman collections
-        self.reports_path = "reports/"
-        self.ensure_directories()
+        # The coordinator writes the merged reports, so the local copies are not kept
+        for key in ("html_report", "json_report"):
+            if result.get(key) and os.path.exists(result[key]):
+                os.remove(result[key])
 
-        # Mock service configurations
-        self.all_services = [
-            "User Authentication Service",
-            "Payment Gateway Service",
-            "Order Management Service",
-            "Inventory Service",
-            "Notification Service",
-            "Analytics Service",
-            "Reporting Service",
-            "Security Service"
-        ]
+        events.put({"event": "result", "result": {
+            key: result.get(key) for key in ("success", "json_data", "error", "stderr", "mock") if key in result
+        }})
+        events.put(None)
+        uploader.join()
 
-        self.services_with_dependencies = {
-            "Payment Gateway Service": ["User Authentication Service"],
-            "Order Management Service": ["Payment Gateway Service", "Inventory Service"],
-            "Notification Service": ["User Authentication Service", "Order Management Service"]
-        }
+class RunScheduler:
+    """Run services on fixed intervals and whenever their collection folder or environment changes"""
 
-    def ensure_directories(self):
-        """Create necessary directories if they don't exist"""
-        Path(self.collections_path).mkdir(exist_ok=True)
-        Path(self.reports_path).mkdir(exist_ok=True)
+    def __init__(self, job_queue, tick=1.0, watch_interval=10):
+        self.job_queue = job_queue
+        self.tick = tick
+        self.watch_interval = watch_interval
+        self.lock = threading.Lock()
+        self.collection_path = None
+        self.environment = None
+        self.intervals = {}
+        self.watch = False
+        self.reuse_window = 0
+        self.engine = "newman"
+        self.coordinator = None
+        self.concurrency = PYTHON_ENGINE_CONCURRENCY
+        self.next_due = {}
+        self.fingerprints = {}
+        self.file_state = None
+        self.last_watch = 0
+        self.jobs = {}
+        self.log = deque(maxlen=50)
+        threading.Thread(target=self.loop, daemon=True).start()
 
-    def run_newman_command(self, collection_path, environment=None, folder=None):
-        """Execute Newman command and return results"""
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_path = os.path.join(self.reports_path, f"report_{timestamp}.html")
-        json_report_path = os.path.join(self.reports_path, f"report_{timestamp}.json")
+    def configure(self, collection_path, environment, intervals, watch, reuse_window, engine="newman",
+                  coordinator=None, concurrency=PYTHON_ENGINE_CONCURRENCY):
+        """Replace the schedule; intervals map services to minutes, 0 meaning off"""
+        now = time.time()
+        with self.lock:
+            if (collection_path, environment) != (self.collection_path, self.environment):
+                # New files get a fresh baseline instead of counting as a change
+                self.fingerprints = {}
+                self.file_state = None
+            self.collection_path = collection_path
+            self.environment = environment
+            self.watch = watch
+            self.reuse_window = reuse_window
+            self.engine = engine
+            self.coordinator = coordinator
+            self.concurrency = concurrency
+            self.next_due = {
+                service: self.next_due[service] if self.intervals.get(service) == minutes and service in self.next_due
+                else now + minutes * 60
+                for service, minutes in intervals.items() if minutes
+            }
+            self.intervals = {service: minutes for service, minutes in intervals.items() if minutes}
 
-        # Build Newman command
-        cmd = [
-            "newman", "run", collection_path,
-            "--reporters", "html,json",
-            "--reporter-html-export", report_path,
-            "--reporter-json-export", json_report_path
-        ]
+    def loop(self):
+        while True:
+            time.sleep(self.tick)
+            try:
+                self.check(time.time())
+            except Exception as e:
+                self.log.appendleft((datetime.datetime.now(), "scheduler", f"error: {e}"))
 
-        if environment:
-            cmd.extend(["--environment", environment])
+    def check(self, now):
+        with self.lock:
+            if not self.collection_path:
+                return
+            due = [service for service, at in self.next_due.items() if now >= at]
+            for service in due:
+                self.next_due[service] = now + self.intervals[service] * 60
+            watch = self.watch and now - self.last_watch >= self.watch_interval
+            if watch:
+                self.last_watch = now
 
-        if folder:
-            cmd.extend(["--folder", folder])
+        for service in due:
+            self.trigger(service, "scheduled")
+        if watch:
+            for service in self.changed_services():
+                self.trigger(service, "changed")
 
+    def changed_services(self):
+        """Services whose folder fingerprint changed since the last look; stat first so idle checks stay cheap"""
+        paths = [path for path in (self.collection_path, self.environment) if path]
         try:
-            # Execute Newman command
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+            state = [(os.stat(path).st_mtime_ns, os.stat(path).st_size) for path in paths]
+        except OSError:
+            return []
+        if state == self.file_state:
+            return []
+        self.file_state = state
 
-            # Parse JSON report for detailed results
-            if os.path.exists(json_report_path):
-                with open(json_report_path, 'r') as f:
-                    json_results = json.load(f)
-                return {
-                    "success": result.returncode == 0,
-                    "html_report": report_path,
-                    "json_report": json_report_path,
-                    "json_data": json_results,
-                    "stdout": result.stdout,
-                    "stderr": result.stderr
-                }
+        dashboard = self.dashboard()
+        changed = []
+        for service in dashboard.all_services:
+            fingerprint = dashboard.fingerprint(self.collection_path, self.environment, service)
+            previous = self.fingerprints.get(service)
+            self.fingerprints[service] = fingerprint
+            if fingerprint and previous and fingerprint != previous:
+                changed.append(service)
+        return changed
+
+    def dashboard(self):
+        dashboard = TestDashboard(
+            process_slots=self.job_queue.process_slots, engine=self.engine, coordinator=self.coordinator
+        )
+        dashboard.reuse_window = self.reuse_window
+        dashboard.python_engine_concurrency = self.concurrency
+        return dashboard
+
+    def trigger(self, service, reason):
+        """Queue a run of one service unless its previous triggered run is still going"""
+        job = self.job_queue.get(self.jobs.get(service))
+        if job and job['status'] in ("queued", "running"):
+            self.log.appendleft((datetime.datetime.now(), service, f"{reason} run skipped, previous run still going"))
+            return
+        self.jobs[service] = self.job_queue.submit(
+            f"{reason.capitalize()} run: {service}",
+            self.dashboard().execute_tests,
+            "Run Individual Service",
+            self.collection_path,
+            self.environment,
+            [service]
+        )
+        self.log.appendleft((datetime.datetime.now(), service, f"{reason} run queued"))
+
+    def status(self):
+        """One row per scheduled service with its interval, next run and last triggered job"""
+        now = time.time()
+        with self.lock:
+            rows = []
+            for service, minutes in self.intervals.items():
+                job = self.job_queue.get(self.jobs.get(service))
+                rows.append({
+                    "Service": service,
+                    "Every (min)": minutes,
+                    "Next Run In (s)": max(0, int(self.next_due.get(service, now) - now)),
+                    "Last Run": job['status'] if job else "-"
+                })
+            return rows
+
+class JsonStream:
+    """Decode a JSON document value by value instead of loading it whole"""
+
+    whitespace = re.compile(r'\s*')
+    number_tail = re.compile(r'[0-9.eE+-]*')  # Characters that may still continue a number
+
+    def __init__(self, f, chunk_size=1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.decoder = json.JSONDecoder()
+
+    def read_more(self, size):
+        """Append the next chunk of the file, dropping what has already been consumed"""
+        chunk = self.f.read(size)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return bool(chunk)
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it"""
+        while True:
+            self.pos = self.whitespace.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.read_more(self.chunk_size):
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' in JSON report")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.read_more(size):
+                    raise
             else:
-                # Return mock data if Newman is not available
-                return self.generate_mock_results(report_path)
+                # A number cut off by the end of the buffer ("12." or "1e") decodes as its prefix,
+                # so only trust the value once something other than number characters follows it
+                if not self.number_tail.fullmatch(self.buffer, end):
+                    self.pos = end
+                    return value
+                consumed = end - self.pos
+                if not self.read_more(size):
+                    self.pos = consumed
+                    return value
+            size *= 2
 
-        except subprocess.TimeoutExpired:
-            return {"success": False, "error": "Test execution timed out"}
-        except FileNotFoundError:
-            # Newman not installed, return mock data
-            return self.generate_mock_results(report_path)
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+    def skip(self):
+        """Consume the next value without keeping it"""
+        self.value()
 
-    def generate_mock_results(self, report_path):
-        """Generate mock test results for demonstration"""
-        import random
+    def object_keys(self):
+        """Yield the keys of the next object; the caller must consume each value"""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            yield key
+            char = self.peek()
+            self.pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise ValueError("Malformed object in JSON report")
 
-        # Generate mock JSON data
-        mock_data = {
-            "run": {
-                "stats": {
-                    "tests": {"total": 45, "pending": 2, "failed": 3},
-                    "assertions": {"total": 180, "pending": 8, "failed": 3},
-                    "requests": {"total": 45, "pending": 0, "failed": 2}
-                },
-                "timings": {"responseAverage": 245, "responseMin": 89, "responseMax": 1205},
-                "executions": []
+    def array_values(self):
+        """Yield the elements of the next array one at a time"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError("Malformed array in JSON report")
+
+class ExecutionSummary:
+    """Accumulate run stats and timings one execution at a time"""
+
+    def __init__(self):
+        self.requests = 0
+        self.failed_requests = 0
+        self.assertions = 0
+        self.failed_assertions = 0
+        self.response_sum = 0
+        self.response_min = None
+        self.response_max = None
+
+    def add(self, execution):
+        response_time = execution['response']['responseTime'] or 0
+        failed = sum(1 for assertion in execution['assertions'] if assertion.get('error'))
+
+        self.requests += 1
+        self.failed_requests += 1 if failed else 0
+        self.assertions += len(execution['assertions'])
+        self.failed_assertions += failed
+        self.response_sum += response_time
+        self.response_min = response_time if self.response_min is None else min(self.response_min, response_time)
+        self.response_max = response_time if self.response_max is None else max(self.response_max, response_time)
+
+    def stats(self):
+        return {
+            "tests": {"total": self.requests, "pending": 0, "failed": self.failed_requests},
+            "assertions": {"total": self.assertions, "pending": 0, "failed": self.failed_assertions},
+            "requests": {"total": self.requests, "pending": 0, "failed": self.failed_requests}
+        }
+
+    def timings(self):
+        return {
+            "responseAverage": round(self.response_sum / self.requests) if self.requests else 0,
+            "responseMin": self.response_min or 0,
+            "responseMax": self.response_max or 0
+        }
+
+class PhaseTimer:
+    """Thread-safe wall time per phase, plus CPU and memory of each Newman process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.phases = {}
+            self.processes = []
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name, seconds):
+        with self.lock:
+            phase = self.phases.setdefault(name, {"seconds": 0.0, "calls": 0})
+            phase["seconds"] += seconds
+            phase["calls"] += 1
+
+    def add_process(self, label, wall_seconds, usage):
+        with self.lock:
+            self.processes.append({
+                "label": label,
+                "wall_seconds": wall_seconds,
+                "cpu_user": usage.ru_utime,
+                "cpu_system": usage.ru_stime,
+                # ru_maxrss is in kilobytes on Linux and bytes on macOS
+                "max_rss_bytes": usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+            })
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "phases": {name: dict(phase) for name, phase in self.phases.items()},
+                "processes": [dict(process) for process in self.processes]
             }
+
+def timing_phases(response):
+    """Per-request timing phases in ms from Newman's timingPhases or raw timings offsets, if it reported any"""
+    if response.get('timingPhases'):
+        return response['timingPhases']
+    offset = (response.get('timings') or {}).get('offset')
+    if not offset:
+        return None
+    connected = offset.get('secureConnect', offset.get('connect', offset.get('socket', 0)))
+    return {
+        "wait": offset.get('socket', 0),
+        "dns": offset.get('lookup', offset.get('socket', 0)) - offset.get('socket', 0),
+        "tcp": offset.get('connect', offset.get('lookup', 0)) - offset.get('lookup', offset.get('socket', 0)),
+        "secureHandshake": offset['secureConnect'] - offset.get('connect', 0) if 'secureConnect' in offset else 0,
+        "firstByte": offset.get('response', connected) - connected,
+        "download": offset.get('end', offset.get('response', 0)) - offset.get('response', 0),
+        "total": offset.get('end', 0)
+    }
+
+def request_phase_summary(executions):
+    """Median, p95 and mean of each timing phase across the executions that carry them"""
+    import numpy as np
+
+    samples = {}
+    for execution in executions:
+        for name, value in (execution.get('response', {}).get('timings') or {}).items():
+            samples.setdefault(name, []).append(value)
+    return {
+        name: {
+            "p50": float(np.percentile(values, 50)),
+            "p95": float(np.percentile(values, 95)),
+            "mean": float(np.mean(values))
         }
+        for name, values in samples.items()
+    }
+
+# Applied in order, so timestamps and IDs are masked before their digits are
+ERROR_MASKS = [
+    (re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?'), '<timestamp>'),
+    (re.compile(r'\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b'), '<uuid>'),
+    (re.compile(r'\b[0-9a-fA-F]{12,}\b'), '<id>'),
+    (re.compile(r'\b(?=[A-Za-z_-]*\d)(?=[\d_-]*[A-Za-z])[A-Za-z0-9_-]{8,}\b'), '<id>'),
+    (re.compile(r'\d+(?:\.\d+)?'), '<n>'),
+    (re.compile(r'\s+'), ' ')
+]
+
+def error_signature(message):
+    """Mask the parts of an assertion error that change between occurrences of the same failure"""
+    for pattern, mask in ERROR_MASKS:
+        message = pattern.sub(mask, message)
+    return message.strip()[:500]
+
+def cluster_failures(executions, sample_size=5):
+    """Group failed assertions by error signature, service and status code in a single pass, largest first"""
+    clusters = {}
+    signatures = {}
+    for index, execution in enumerate(executions):
+        service = execution.get('folder') or "Unassigned"
+        code = (execution.get('response') or {}).get('code', 0) or 0
+        for assertion in execution.get('assertions', []):
+            if not assertion.get('error'):
+                continue
+            message = assertion['error'].get('message') or ""
+            # Outages repeat the exact same message, so each distinct one is only normalized once
+            signature = signatures.get(message)
+            if signature is None:
+                signature = signatures[message] = error_signature(message)
+
+            key = (signature, service, code)
+            cluster = clusters.get(key)
+            if cluster is None:
+                cluster = clusters[key] = {
+                    "cluster_id": hashlib.sha1(json.dumps(key).encode()).hexdigest()[:12],
+                    "signature": signature,
+                    "service": service,
+                    "status_code": code,
+                    "assertion": assertion.get('assertion'),
+                    "example": message,
+                    "occurrences": 0,
+                    "requests": 0,
+                    "tests": [],
+                    "last_index": None
+                }
+            cluster["occurrences"] += 1
+            if cluster["last_index"] != index:
+                cluster["last_index"] = index
+                cluster["requests"] += 1
+                if len(cluster["tests"]) < sample_size:
+                    cluster["tests"].append(execution['item']['name'])
+
+    for cluster in clusters.values():
+        del cluster["last_index"]
+    return sorted(clusters.values(), key=lambda cluster: cluster["occurrences"], reverse=True)
+
+class SyntheticRun:
+    """Seeded generator for Newman-style runs whose stats and timings match their executions"""
+
+    ERROR_CODES = [400, 404, 409, 500, 502, 503]
+
+    def __init__(self, size=45, failure_rate=0.1, latency="lognormal", median_ms=200, spread=0.5,
+                 services=None, assertions_per_request=1, body_bytes=0, seed=None):
+        self.size = size
+        self.failure_rate = failure_rate
+        self.latency = latency
+        self.median_ms = median_ms
+        self.spread = spread
+        # An int names that many services, a list is used as is, None leaves executions untagged
+        self.services = [f"Service {i+1}" for i in range(services)] if isinstance(services, int) else services
+        self.assertions_per_request = max(1, assertions_per_request)
+        self.body_bytes = body_bytes
+        self.seed = seed
+
+    def response_time(self, rng):
+        if self.latency == "lognormal":
+            value = rng.lognormvariate(math.log(self.median_ms), self.spread)
+        elif self.latency == "normal":
+            value = rng.gauss(self.median_ms, self.median_ms * self.spread)
+        elif self.latency == "uniform":
+            value = rng.uniform(self.median_ms * (1 - self.spread), self.median_ms * (1 + self.spread))
+        elif self.latency == "exponential":
+            value = rng.expovariate(1 / self.median_ms)
+        else:
+            raise ValueError(f"Unknown latency distribution: {self.latency}")
+        return max(1, int(round(value)))
+
+    def executions(self):
+        """Yield executions one at a time so huge runs never sit in memory"""
+        import random
+        rng = random.Random(self.seed)
+        body = "x" * self.body_bytes
+
+        for i in range(self.size):
+            failed = rng.random() < self.failure_rate
+            code = rng.choice(self.ERROR_CODES) if failed else rng.choice([200, 200, 200, 201])
+            assertions = [{
+                "assertion": "Status code is 200",
+                "error": {"message": f"expected response to have status code 200 but got {code}"} if failed else None
+            }]
+            assertions += [
+                {"assertion": f"Response field {n} is present", "error": None}
+                for n in range(1, self.assertions_per_request)
+            ]
 
-        # Generate mock executions
-        for i in range(45):
             execution = {
                 "item": {"name": f"Test Case {i+1}"},
-                "response": {
-                    "responseTime": random.randint(50, 500),
-                    "code": random.choice([200, 201, 400, 500])
-                },
-                "assertions": [
-                    {"assertion": "Status code is 200", "error": None if random.random() > 0.1 else {"message": "Expected 200 but got 400"}}
-                ]
+                "response": {"responseTime": self.response_time(rng), "code": code},
+                "assertions": assertions
             }
-            mock_data["run"]["executions"].append(execution)
+            if body:
+                execution["response"]["body"] = body
+            if self.services:
+                execution["folder"] = self.services[i % len(self.services)]
+            yield execution
 
-        # Generate mock HTML report
-        self.generate_html_report(mock_data, report_path)
+    def build(self):
+        """Return the whole run as a Newman report dict"""
+        summary = ExecutionSummary()
+        executions = []
+        for execution in self.executions():
+            summary.add(execution)
+            executions.append(execution)
+        return {"run": {"stats": summary.stats(), "timings": summary.timings(), "executions": executions}}
 
-        return {
-            "success": True,
-            "html_report": report_path,
-            "json_data": mock_data,
-            "mock": True
-        }
+    def write(self, path):
+        """Stream the run to a JSON (or .gz) report, writing stats and timings after the executions"""
+        summary = ExecutionSummary()
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'wt', encoding='utf-8') as f:
+            f.write('{"run": {"executions": [')
+            for i, execution in enumerate(self.executions()):
+                summary.add(execution)
+                f.write((',' if i else '') + json.dumps(execution))
+            f.write(f'], "stats": {json.dumps(summary.stats())}, "timings": {json.dumps(summary.timings())}}}}}')
+        return summary
 
-    def generate_html_report(self, json_data, report_path):
-        """Generate HTML report from JSON data"""
-        stats = json_data["run"]["stats"]
+def cache_resource(func):
+    """st.cache_resource, applied on first call so importing this module does not import streamlit"""
+    cached = []
 
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Test Execution Report</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 20px; background: #f5f5f5; }}
-                .container {{ max-width: 1200px; margin: 0 auto; background: white; padding: 30px; border-radius: 10px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); }}
-                .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; border-radius: 10px; text-align: center; margin-bottom: 30px; }}
-                .summary {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 20px; margin-bottom: 30px; }}
-                .card {{ background: #f8f9fa; padding: 20px; border-radius: 10px; text-align: center; border-left: 5px solid; }}
-                .card.total {{ border-left-color: #3b82f6; }}
-                .card.passed {{ border-left-color: #10b981; }}
-                .card.failed {{ border-left-color: #ef4444; }}
-                .card.pending {{ border-left-color: #f59e0b; }}
-                .card h3 {{ font-size: 2.5em; margin: 0; }}
-                .card p {{ margin: 10px 0 0 0; color: #666; font-weight: bold; }}
-                .section {{ margin: 30px 0; }}
-                .section h2 {{ color: #333; border-bottom: 2px solid #667eea; padding-bottom: 10px; }}
-                table {{ width: 100%; border-collapse: collapse; margin-top: 20px; }}
-                th, td {{ padding: 12px; text-align: left; border-bottom: 1px solid #e5e7eb; }}
-                th {{ background: #f9fafb; font-weight: 600; }}
-                .status-passed {{ color: #10b981; font-weight: bold; }}
-                .status-failed {{ color: #ef4444; font-weight: bold; }}
-                .footer {{ text-align: center; margin-top: 40px; color: #666; font-size: 0.9em; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>🧪 Test Execution Report</h1>
-                    <p>Generated on {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-                </div>
+    @functools.wraps(func)
+    def wrapper():
+        if not cached:
+            import streamlit as st
+            cached.append(st.cache_resource(func))
+        return cached[0]()
+    return wrapper
 
-                <div class="summary">
-                    <div class="card total">
-                        <h3>{stats['tests']['total']}</h3>
-                        <p>Total Tests</p>
-                    </div>
-                    <div class="card passed">
-                        <h3>{stats['tests']['total'] - stats['tests']['failed'] - stats['tests']['pending']}</h3>
-                        <p>Passed</p>
-                    </div>
-                    <div class="card failed">
-                        <h3>{stats['tests']['failed']}</h3>
-                        <p>Failed</p>
-                    </div>
-                    <div class="card pending">
-                        <h3>{stats['tests']['pending']}</h3>
-                        <p>Pending</p>
-                    </div>
-                </div>
+@cache_resource
+def get_result_cache():
+    """Share parsed tables, figures and report bytes across reruns and sessions"""
+    return ResultCache()
 
-                <div class="section">
-                    <h2>📊 Execution Summary</h2>
-                    <table>
-                        <tr><td><strong>Total Requests:</strong></td><td>{stats['requests']['total']}</td></tr>
-                        <tr><td><strong>Failed Requests:</strong></td><td>{stats['requests']['failed']}</td></tr>
-                        <tr><td><strong>Total Assertions:</strong></td><td>{stats['assertions']['total']}</td></tr>
-                        <tr><td><strong>Failed Assertions:</strong></td><td>{stats['assertions']['failed']}</td></tr>
-                    </table>
-                </div>
+@cache_resource
+def get_run_comparator():
+    """Keep the cross-run comparison index in memory between reruns"""
+    dashboard = TestDashboard()
+    return RunComparator(dashboard.reports_path, dashboard.load_json_report, dashboard.reports.run_reports)
 
-                <div class="footer">
-                    <p>Report generated by Newman Test Dashboard | {datetime.datetime.now().year}</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+@cache_resource
+def get_mail_queue():
+    """Share pooled SMTP connections and the send queue between sessions"""
+    return MailQueue(SmtpConnectionPool())
 
-        with open(report_path, 'w') as f:
-            f.write(html_content)
+@cache_resource
+def get_coordinator():
+    """Start the agent coordinator once and share it between sessions"""
+    return AgentCoordinator(token=os.environ.get("NEWMAN_AGENT_TOKEN")).start()
 
-    def send_email_report(self, report_path, recipient_email, smtp_config):
-        """Send HTML report via email"""
-        try:
-            msg = MIMEMultipart()
-            msg['From'] = smtp_config['sender_email']
-            msg['To'] = recipient_email
-            msg['Subject'] = f"Test Execution Report - {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-
-            # Email body
-            body = """
-            Hello,
-
-            Please find attached the test execution report.
-
-            Summary:
-            - Report generated successfully
-            - Timestamp: {}
-
-            Best regards,
-            Test Automation Team
-            """.format(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
-
-            msg.attach(MIMEText(body, 'plain'))
-
-            # Attach HTML report
-            with open(report_path, "rb") as attachment:
-                part = MIMEBase('application', 'octet-stream')
-                part.set_payload(attachment.read())
-                encoders.encode_base64(part)
-                part.add_header(
-                    'Content-Disposition',
-                    f'attachment; filename= {os.path.basename(report_path)}'
-                )
-                msg.attach(part)
+@cache_resource
+def get_scheduler():
+    """One scheduler per dashboard server, feeding the shared job queue"""
+    return RunScheduler(get_job_queue())
 
-            # Send email
-            server = smtplib.SMTP(smtp_config['smtp_server'], smtp_config['smtp_port'])
-            server.starttls()
-            server.login(smtp_config['sender_email'], smtp_config['sender_password'])
-            server.send_message(msg)
-            server.quit()
+@cache_resource
+def get_job_queue():
+    """Share one job queue between every session of this dashboard"""
+    return JobQueue(MAX_CONCURRENT_JOBS, MAX_NEWMAN_PROCESSES)
 
-            return True, "Email sent successfully!"
+def parse_recipients(recipient_email):
+    """Split a comma or semicolon separated recipient string into addresses"""
+    if isinstance(recipient_email, (list, tuple)):
+        return [address.strip() for address in recipient_email if address.strip()]
+    return [address.strip() for address in re.split(r'[,;]', recipient_email or "") if address.strip()]
 
-        except Exception as e:
-            return False, f"Failed to send email: {str(e)}"
+def slugify(name):
+    """Turn a service or folder name into a filename-safe slug"""
+    return re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+
+def configure_page():
+    """Set up the Streamlit page; this has to be the first Streamlit call of every script run"""
+    import streamlit as st
+
+    st.set_page_config(
+        page_title="Test Execution Dashboard",
+        page_icon="🧪",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    st.markdown(PAGE_CSS, unsafe_allow_html=True)
 
 def main():
-    dashboard = TestDashboard()
+    render_started = time.perf_counter()
+    configure_page()
+
+    import streamlit as st
+    import pandas as pd
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    job_queue = get_job_queue()
+    scheduler = get_scheduler()
+    mail_queue = get_mail_queue()
+    result_cache = get_result_cache()
+    dashboard = TestDashboard(process_slots=job_queue.process_slots)
 
     # Header
     st.markdown("""
@@ -334,7 +3761,6 @@ def main():
         )
 
         selected_services = []
-        collection_folder = None
 
         if execution_type == "Run Individual Service":
             st.subheader("Select Services:")
@@ -355,6 +3781,47 @@ def main():
         st.subheader("Collection Settings")
         collection_file = st.text_input("Collection File Path:", "collection.json")
         environment_file = st.text_input("Environment File Path (optional):", "")
+        max_workers = st.number_input(
+            "Max Parallel Workers:",
+            min_value=1,
+            value=os.cpu_count() or 1,
+            help="Number of Newman processes allowed to run at the same time"
+        )
+        engine_labels = {"Newman": "newman", "Python (async HTTP)": "python", "Distributed agents": "agents"}
+        dashboard.engine = engine_labels[st.selectbox(
+            "Execution Engine:",
+            list(engine_labels),
+            help="The Python engine runs simple collections in-process without Node/Newman; "
+                 "distributed agents run Newman on other hosts"
+        )]
+        if dashboard.engine == "python":
+            dashboard.python_engine_concurrency = st.number_input(
+                "Concurrent Requests:",
+                min_value=1,
+                value=PYTHON_ENGINE_CONCURRENCY,
+                key="python_engine_concurrency",
+                help="Requests the Python engine keeps in flight at the same time"
+            )
+        if dashboard.engine == "agents":
+            dashboard.coordinator = get_coordinator()
+            agents = dashboard.coordinator.status()
+            st.caption(f"Coordinator on port {dashboard.coordinator.port}: {len(agents)} agent(s), "
+                       f"{dashboard.coordinator.queued()} queued run(s)")
+            for agent in agents:
+                st.write(f"`{agent['name']}` running {agent['running']}, done {agent['completed']}")
+            if not agents:
+                st.info(f"Start agents with: python final_newman_report.py agent "
+                        f"--coordinator http://<this-host>:{dashboard.coordinator.port}")
+        shards = st.number_input(
+            "Shards per Run:",
+            min_value=1,
+            value=1,
+            help="Split the selected requests into this many duration-balanced Newman processes"
+        )
+        dashboard.capture_timings = st.checkbox(
+            "Capture request timing phases",
+            help="Runs Newman with --verbose so DNS, connect, TLS and first-byte times show in Run diagnostics"
+        )
 
         # Email configuration
         st.subheader("📧 Email Configuration")
@@ -363,6 +3830,61 @@ def main():
             sender_password = st.text_input("Sender Password:", type="password", key="sender_password")
             smtp_server = st.text_input("SMTP Server:", "smtp.gmail.com", key="smtp_server")
             smtp_port = st.number_input("SMTP Port:", value=587, key="smtp_port")
+            compression_labels = {
+                "Auto (gzip large reports)": "auto",
+                "None": None,
+                "gzip": "gzip",
+                "zip": "zip"
+            }
+            compression = compression_labels[
+                st.selectbox("Attachment Compression:", list(compression_labels), key="email_compression")
+            ]
+
+        # Scheduled and change-triggered runs
+        st.subheader("⏰ Scheduled Runs")
+        with st.expander("Schedule Settings"):
+            intervals = {
+                service: st.number_input(f"{service} every (min, 0 = off):", min_value=0, value=0,
+                                         key=f"schedule_{slugify(service)}")
+                for service in dashboard.all_services
+            }
+            watch_files = st.checkbox("Re-run services when the collection or environment changes", key="watch_files")
+            reuse_minutes = st.number_input(
+                "Reuse unchanged results for (min):", min_value=0, value=15, key="reuse_minutes",
+                help="Skip Newman when a service's folder, environment and engine are unchanged since a recent run"
+            )
+            if st.button("💾 Apply Schedule", key="apply_schedule"):
+                scheduler.configure(
+                    collection_file, environment_file or None, intervals, watch_files, reuse_minutes * 60,
+                    engine=dashboard.engine, coordinator=dashboard.coordinator,
+                    concurrency=dashboard.python_engine_concurrency
+                )
+                st.success("Schedule updated")
+        if st.checkbox("Reuse unchanged results for manual runs", key="reuse_manual"):
+            dashboard.reuse_window = reuse_minutes * 60
+        for row in scheduler.status():
+            st.write(f"`{row['Service']}` every {row['Every (min)']} min, next in {row['Next Run In (s)']}s "
+                     f"({row['Last Run']})")
+        for logged_at, service, message in list(scheduler.log)[:3]:
+            st.caption(f"{logged_at.strftime('%H:%M:%S')} {service}: {message}")
+
+        # Report storage usage and retention
+        st.subheader("🗄️ Report Storage")
+        stored_runs, stored_bytes = dashboard.reports.usage()
+        st.write(f"{stored_runs} runs, {stored_bytes / (1024 * 1024):.1f} MB")
+        if os.path.exists(dashboard.history.db_path):
+            st.caption(f"History database: {os.path.getsize(dashboard.history.db_path) / (1024 * 1024):.1f} MB")
+        if st.button("🧹 Apply Retention", key="apply_retention"):
+            expired = dashboard.apply_retention()
+            st.success(f"Removed {len(expired)} expired run(s)")
+
+        # Background jobs started from this session
+        if st.session_state.get('jobs'):
+            st.subheader("🗂️ Background Jobs")
+            for job_id in reversed(st.session_state['jobs'][-5:]):
+                job = job_queue.get(job_id)
+                if job:
+                    st.write(f"`{job_id}` {job['description']}: **{job['status']}**")
 
     # Main content area
     col1, col2 = st.columns([2, 1])
@@ -377,51 +3899,53 @@ def main():
             elif execution_type == "Run Individual Service" and not selected_services:
                 st.error("Please select at least one service!")
             else:
-                # Show execution progress
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-
-                status_text.text("Initializing test execution...")
-                progress_bar.progress(10)
-                time.sleep(1)
-
-                status_text.text("Loading collection and environment...")
-                progress_bar.progress(30)
-                time.sleep(1)
-
-                status_text.text("Executing Newman tests...")
-                progress_bar.progress(60)
-                time.sleep(2)
-
-                # Determine folder based on selection
-                if execution_type == "Run Individual Service":
-                    collection_folder = selected_services[0] if selected_services else None
-                elif execution_type == "Run Services with Dependencies":
-                    collection_folder = list(dashboard.services_with_dependencies.keys())[0]
-
-                # Execute tests
-                results = dashboard.run_newman_command(
+                # Queue the run so the session stays responsive while Newman works
+                job_id = job_queue.submit(
+                    f"{execution_type} ({', '.join(selected_services)})" if selected_services else execution_type,
+                    dashboard.execute_tests,
+                    execution_type,
                     collection_file,
                     environment_file if environment_file else None,
-                    collection_folder
+                    selected_services,
+                    max_workers,
+                    shards=shards
                 )
-
-                progress_bar.progress(100)
-                status_text.text("Test execution completed!")
-
-                # Store results in session state
-                st.session_state['test_results'] = results
-                st.session_state['execution_type'] = execution_type
+                st.session_state.setdefault('jobs', []).append(job_id)
+                st.session_state['active_job'] = job_id
                 st.session_state['selected_services'] = selected_services
 
-                time.sleep(1)
-                st.experimental_rerun()
+        # Show live progress of the active background job; only this panel refreshes while it runs
+        @st.fragment(run_every=1 if 'active_job' in st.session_state else None)
+        def job_progress():
+            active_job = job_queue.get(st.session_state.get('active_job'))
+            if not active_job:
+                return
+            snapshot = active_job['progress'].snapshot()
+            if active_job['status'] in ("queued", "running"):
+                if active_job['status'] == "queued":
+                    st.info("Waiting for a free worker...")
+                st.progress(int(100 * snapshot['completed'] / snapshot['total']) if snapshot['total'] else 0)
+                st.text(
+                    f"{snapshot['completed']}/{snapshot['total']} requests | "
+                    f"✅ {snapshot['passed']} passed | ❌ {snapshot['failed']} failed"
+                    + (f" | Running: {snapshot['current']}" if snapshot['current'] else "")
+                )
+                if snapshot['failures']:
+                    st.markdown("**Failing so far:** " + ", ".join(snapshot['failures'][-10:]))
+            else:
+                # Store results in session state and redraw the whole page with them
+                st.session_state['test_results'] = active_job['result']
+                del st.session_state['active_job']
+                st.toast("Test execution completed!")
+                st.rerun()
+
+        job_progress()
 
     with col2:
         st.header("📊 Quick Stats")
         if 'test_results' in st.session_state and st.session_state['test_results']:
             results = st.session_state['test_results']
-            if results.get('success'):
+            if results.get('json_data'):
                 stats = results['json_data']['run']['stats']
 
                 col_a, col_b = st.columns(2)
@@ -442,9 +3966,22 @@ def main():
 
         st.header("📋 Test Results")
 
-        if results.get('success'):
+        if results.get('json_data'):
             stats = results['json_data']['run']['stats']
 
+            if not results.get('success'):
+                st.warning(f"Not every test passed. {results.get('error') or ''}")
+            reused = [folder for folder, result in results.get('folder_results', {}).items() if result.get('cached')]
+            if results.get('cached') or reused:
+                st.info(f"♻️ Reused recent results for unchanged {', '.join(reused) or 'collection'}")
+            if results.get('rerun'):
+                rerun = results['rerun']
+                st.info(
+                    f"Re-ran {len(rerun['rerun'])} failed test(s): {len(rerun['now_passing'])} now passing, "
+                    f"{len(rerun['still_failing'])} still failing"
+                    + (f" (re-run of {results['parent_run_id']})" if results.get('parent_run_id') else "")
+                )
+
             # Summary metrics
             col1, col2, col3, col4 = st.columns(4)
 
@@ -485,30 +4022,15 @@ def main():
 
             # Visualization
             col1, col2 = st.columns(2)
+            pie_chart, assertions_chart = result_cache.get(
+                results.get('json_report'), "figures", lambda: dashboard.build_summary_figures(stats)
+            )
 
             with col1:
-                # Pie chart for test results
-                labels = ['Passed', 'Failed', 'Pending']
-                values = [passed, stats['tests']['failed'], stats['tests']['pending']]
-                colors = ['#10b981', '#ef4444', '#f59e0b']
-
-                fig = go.Figure(data=[go.Pie(labels=labels, values=values, hole=.3)])
-                fig.update_traces(marker=dict(colors=colors))
-                fig.update_layout(title="Test Results Distribution", showlegend=True)
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(pie_chart, use_container_width=True)
 
             with col2:
-                # Bar chart for assertions
-                categories = ['Total', 'Failed', 'Pending']
-                assertion_values = [
-                    stats['assertions']['total'],
-                    stats['assertions']['failed'],
-                    stats['assertions']['pending']
-                ]
-
-                fig = px.bar(x=categories, y=assertion_values, title="Assertions Summary")
-                fig.update_traces(marker_color=['#3b82f6', '#ef4444', '#f59e0b'])
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(assertions_chart, use_container_width=True)
 
             # Action buttons
             st.header("📤 Actions")
@@ -517,21 +4039,36 @@ def main():
             with col1:
                 # Download report button
                 if os.path.exists(results['html_report']):
-                    with open(results['html_report'], 'rb') as file:
+                    report_bytes = result_cache.get(
+                        results['html_report'], "report_bytes", lambda: Path(results['html_report']).read_bytes()
+                    )
+                    st.download_button(
+                        label="⬇️ Download HTML Report",
+                        data=report_bytes,
+                        file_name=f"test_report_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.html",
+                        mime="text/html",
+                        key="download_report"
+                    )
+
+                # CSV export is written to disk row by row on request, then served from the cache like the report
+                if results.get('json_report'):
+                    csv_path = dashboard.csv_report_path(results)
+                    if os.path.exists(csv_path) or st.button("📄 Prepare CSV Results", key="prepare_csv"):
+                        csv_path = dashboard.export_csv(results)
                         st.download_button(
-                            label="⬇️ Download HTML Report",
-                            data=file.read(),
-                            file_name=f"test_report_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.html",
-                            mime="text/html",
-                            key="download_report"
+                            label="⬇️ Download CSV Results",
+                            data=result_cache.get(csv_path, "csv_bytes", lambda: Path(csv_path).read_bytes()),
+                            file_name=f"test_results_{results.get('run_id', 'run')}.csv",
+                            mime="text/csv",
+                            key="download_csv"
                         )
 
             with col2:
                 # Email report button
-                recipient_email = st.text_input("Recipient Email:", key="recipient_email")
+                recipient_email = st.text_input("Recipient Emails (comma-separated):", key="recipient_email")
 
                 if st.button("📧 Send Email Report", key="send_email"):
-                    if not recipient_email:
+                    if not parse_recipients(recipient_email):
                         st.error("Please enter recipient email!")
                     elif not sender_email:
                         st.error("Please configure sender email in sidebar!")
@@ -543,58 +4080,418 @@ def main():
                             'smtp_port': smtp_port
                         }
 
-                        success, message = dashboard.send_email_report(
+                        # Sending happens in the background so the page stays responsive
+                        st.session_state['email_job'] = mail_queue.submit(
+                            dashboard,
                             results['html_report'],
                             recipient_email,
-                            smtp_config
+                            smtp_config,
+                            compression
                         )
 
-                        if success:
-                            st.success(message)
+                email_job = mail_queue.get(st.session_state.get('email_job'))
+                email_pending = bool(email_job) and email_job['status'] in ("queued", "sending")
+
+                @st.fragment(run_every=1 if email_pending else None)
+                def email_status():
+                    email_job = mail_queue.get(st.session_state.get('email_job'))
+                    if email_job:
+                        if email_job['status'] == "sent":
+                            st.success(email_job['message'])
+                        elif email_job['status'] == "failed":
+                            st.error(email_job['message'])
                         else:
-                            st.error(message)
+                            st.info(f"📨 {email_job['message']}")
+
+                email_status()
 
             with col3:
                 # View report button
                 if st.button("👁️ View Report", key="view_report"):
                     if os.path.exists(results['html_report']):
-                        with open(results['html_report'], 'r') as file:
-                            report_content = file.read()
-                            st.components.v1.html(report_content, height=600, scrolling=True)
+                        report_content = result_cache.get(
+                            results['html_report'], "report_bytes", lambda: Path(results['html_report']).read_bytes()
+                        )
+                        st.components.v1.html(report_content.decode('utf-8'), height=600, scrolling=True)
 
             # Detailed results table
             st.header("📝 Detailed Results")
 
+            if stats['tests']['failed'] and st.button("🔁 Re-run Failed Tests", key="rerun_failures"):
+                job_id = job_queue.submit(
+                    "Re-run failed tests",
+                    dashboard.rerun_failures,
+                    results,
+                    collection_file,
+                    environment_file if environment_file else None
+                )
+                st.session_state.setdefault('jobs', []).append(job_id)
+                st.session_state['active_job'] = job_id
+                st.rerun()
+
             # Create DataFrame for test results
             if 'executions' in results['json_data']['run']:
                 executions = results['json_data']['run']['executions']
 
-                test_data = []
-                for execution in executions:
-                    test_name = execution['item']['name']
-                    response_time = execution.get('response', {}).get('responseTime', 0)
-                    status_code = execution.get('response', {}).get('code', 0)
-
-                    # Check assertions
-                    assertions = execution.get('assertions', [])
-                    failed_assertions = [a for a in assertions if a.get('error')]
-                    status = "FAILED" if failed_assertions else "PASSED"
-
-                    test_data.append({
-                        'Test Name': test_name,
-                        'Status': status,
-                        'Response Time (ms)': response_time,
-                        'Status Code': status_code,
-                        'Assertions': len(assertions),
-                        'Failed Assertions': len(failed_assertions)
-                    })
-
-                df = pd.DataFrame(test_data)
-                st.dataframe(df, use_container_width=True)
+                def build_table():
+                    started = time.perf_counter()
+                    table = dashboard.build_execution_table(executions)
+                    results.setdefault('diagnostics', {}).setdefault('phases', {})['dataframe'] = {
+                        "seconds": time.perf_counter() - started, "calls": 1
+                    }
+                    return table
+
+                df = result_cache.get(results.get('json_report'), "execution_table", build_table)
+
+                # Filtering, sorting and paging happen here so only the visible page reaches the browser
+                filter_col1, filter_col2, filter_col3 = st.columns(3)
+                with filter_col1:
+                    status_filter = st.multiselect("Status", ["FAILED", "PASSED"], key="explorer_status")
+                    name_query = st.text_input("Test name contains", key="explorer_name")
+                with filter_col2:
+                    code_filter = st.multiselect(
+                        "Status Code", sorted(df["Status Code"].unique().tolist()), key="explorer_codes"
+                    )
+                    max_latency = float(df["Response Time (ms)"].max()) if len(df) else 0.0
+                    latency_range = st.slider(
+                        "Response Time (ms)", 0.0, max(max_latency, 1.0), (0.0, max(max_latency, 1.0)),
+                        key="explorer_latency"
+                    )
+                with filter_col3:
+                    sort_by = st.selectbox(
+                        "Sort by", ["Response Time (ms)", "Test Name", "Service", "Status Code", "Failed Assertions"],
+                        key="explorer_sort"
+                    )
+                    ascending = st.checkbox("Ascending", value=False, key="explorer_ascending")
+                    pin_failures = st.checkbox("Pin failures to top", value=True, key="explorer_pin")
+
+                view = dashboard.filter_execution_table(
+                    df, status_filter, code_filter, latency_range, name_query, sort_by, ascending, pin_failures
+                )
+
+                page_size = 100
+                page_count = max(1, -(-len(view) // page_size))
+                page = st.number_input(
+                    f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, key="explorer_page"
+                ) if page_count > 1 else 1
+                start = (int(page) - 1) * page_size
+                st.caption(f"Showing {min(start + 1, len(view))}-{min(start + page_size, len(view))} of {len(view)} "
+                           f"matching requests ({len(df)} total)")
+                st.dataframe(view.iloc[start:start + page_size], use_container_width=True)
+
+                # Thousands of failures usually come down to a handful of root causes
+                if 'clusters' not in results:
+                    results['clusters'] = cluster_failures(executions)
+                clusters = results['clusters']
+                if clusters:
+                    st.header("🧩 Failure Clusters")
+                    occurrences = sum(cluster['occurrences'] for cluster in clusters)
+                    st.markdown(f"**{len(clusters)} root cause{'s' if len(clusters) != 1 else ''}, "
+                                f"{occurrences:,} occurrence{'s' if occurrences != 1 else ''}**")
+                    known = dashboard.history.cluster_history([cluster['cluster_id'] for cluster in clusters[:20]])
+                    for cluster in clusters[:20]:
+                        title = (f"{cluster['occurrences']:,}× · {cluster['service']} · {cluster['status_code']} · "
+                                 f"{cluster['signature'][:120]}")
+                        with st.expander(title):
+                            st.code(cluster['example'])
+                            st.write(f"Assertion: {cluster['assertion']} · {cluster['requests']:,} request(s), "
+                                     f"e.g. {', '.join(cluster['tests'])}")
+                            seen = known.get(cluster['cluster_id'])
+                            if seen and seen['runs'] > 1:
+                                st.caption(f"Seen in {seen['runs']} runs ({seen['occurrences']:,} occurrences) "
+                                           f"since {seen['first_seen']}")
+                            else:
+                                st.caption("First seen in this run")
+                    if len(clusters) > 20:
+                        st.caption(f"{len(clusters) - 20} smaller clusters not shown")
+
+                # Percentiles are computed once per run and kept with the results
+                if 'analytics' not in results:
+                    results['analytics'] = dashboard.build_latency_analytics(executions)
+                analytics = results['analytics']
+
+                if analytics['percentiles']:
+                    st.header("⏱️ Latency Analytics")
+
+                    percentile_columns = st.columns(len(analytics['percentiles']))
+                    for column, (label, value) in zip(percentile_columns, analytics['percentiles'].items()):
+                        column.metric(label.upper(), f"{value:.0f} ms")
+
+                    edges = analytics['histogram']['edges']
+                    fig = go.Figure(data=[go.Bar(
+                        x=(edges[:-1] + edges[1:]) / 2,
+                        y=analytics['histogram']['counts'],
+                        width=edges[1:] - edges[:-1]
+                    )])
+                    fig.update_layout(title="Response Time Distribution", xaxis_title="Response Time (ms)",
+                                      yaxis_title="Requests")
+                    st.plotly_chart(fig, use_container_width=True)
+
+                    tab1, tab2, tab3, tab4 = st.tabs(["By Request", "By Service", "By Status Code", "Outliers"])
+                    with tab1:
+                        st.dataframe(analytics['by_request'], use_container_width=True)
+                    with tab2:
+                        st.dataframe(analytics['by_service'], use_container_width=True)
+                    with tab3:
+                        st.dataframe(analytics['by_status_code'], use_container_width=True)
+                    with tab4:
+                        st.caption(f"Requests slower than {analytics['outlier_threshold']:.0f} ms (Q3 + 1.5 × IQR)")
+                        st.dataframe(analytics['outliers'], use_container_width=True)
+
+            diagnostics = results.get('diagnostics')
+            if diagnostics:
+                with st.expander("🩺 Run diagnostics"):
+                    phases = dict(diagnostics.get('phases', {}))
+                    email_job = mail_queue.get(st.session_state.get('email_job'))
+                    for name, seconds in (email_job or {}).get('phases', {}).items():
+                        phases[name] = {"seconds": seconds, "calls": 1}
+                    if 'render_seconds' in st.session_state:
+                        phases['streamlit_render'] = {"seconds": st.session_state['render_seconds'], "calls": 1}
+
+                    st.metric("Run Wall Time", f"{diagnostics.get('total_seconds', 0):.2f} s")
+                    parquet_export = diagnostics.get('parquet_export')
+                    if parquet_export and not parquet_export['success']:
+                        st.warning(parquet_export['message'])
+                    st.caption("Phases that run in parallel are summed over their calls, so they can exceed wall time")
+                    st.dataframe(pd.DataFrame(
+                        [{"Phase": name, "Seconds": round(phase['seconds'], 4), "Calls": phase['calls']}
+                         for name, phase in phases.items()]
+                    ), use_container_width=True)
+
+                    if diagnostics.get('processes'):
+                        st.subheader("Newman Processes")
+                        st.dataframe(pd.DataFrame([
+                            {
+                                "Process": process['label'],
+                                "Wall (s)": round(process['wall_seconds'], 3),
+                                "CPU User (s)": round(process['cpu_user'], 3),
+                                "CPU System (s)": round(process['cpu_system'], 3),
+                                "Peak RSS (MB)": round(process['max_rss_bytes'] / (1024 * 1024), 1)
+                            }
+                            for process in diagnostics['processes']
+                        ]), use_container_width=True)
+
+                    if diagnostics.get('request_phases'):
+                        st.subheader("Request Timing Phases (ms)")
+                        st.dataframe(pd.DataFrame(diagnostics['request_phases']).T.round(1), use_container_width=True)
+                    else:
+                        st.caption("Enable \"Capture request timing phases\" to see DNS, connect, TLS and first byte")
+
+                    st.caption(f"Metrics for scrapers: {dashboard.metrics_path}")
         else:
             st.error(f"Test execution failed: {results.get('error', 'Unknown error')}")
             if results.get('stderr'):
                 st.code(results['stderr'])
 
+    # Compare the latest run with earlier ones
+    st.header("🔁 Regressions & Flaky Tests")
+    comparison_window = st.slider("Runs to compare:", min_value=2, max_value=50, value=10, key="comparison_window")
+    comparison = get_run_comparator().compare(comparison_window)
+
+    if len(comparison['runs']) < 2:
+        st.info("At least two runs are needed for a comparison")
+    else:
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.subheader(f"❌ Newly Failing ({len(comparison['newly_failing'])})")
+            for name in comparison['newly_failing']:
+                st.write(f"- {name}")
+
+            st.subheader(f"🔀 Flaky ({len(comparison['flaky'])})")
+            if comparison['flaky']:
+                st.dataframe(pd.DataFrame(comparison['flaky']), use_container_width=True)
+
+        with col2:
+            st.subheader(f"✅ Newly Passing ({len(comparison['newly_passing'])})")
+            for name in comparison['newly_passing']:
+                st.write(f"- {name}")
+
+            st.subheader(f"🐢 Latency Regressions ({len(comparison['latency_regressions'])})")
+            if comparison['latency_regressions']:
+                st.dataframe(pd.DataFrame(comparison['latency_regressions']), use_container_width=True)
+
+    # Trends across stored runs
+    st.header("📈 Run History")
+    history_scope = st.selectbox("Show trends for:", ["All Services"] + dashboard.all_services, key="history_scope")
+    if history_scope == "All Services":
+        trend = dashboard.history.run_trend()
+    else:
+        trend = dashboard.history.service_trend(history_scope)
+
+    if trend:
+        trend_df = pd.DataFrame(trend)
+        col1, col2 = st.columns(2)
+
+        with col1:
+            fig = px.line(trend_df, x="started_at", y="pass_rate", markers=True, title="Pass Rate (%)")
+            st.plotly_chart(fig, use_container_width=True)
+
+        with col2:
+            fig = px.line(trend_df, x="started_at", y="response_average", markers=True,
+                          title="Average Response Time (ms)")
+            st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("No stored runs yet")
+
+    # Per-test history, e.g. to see when one endpoint started failing or slowing down
+    test_service = None if history_scope == "All Services" else history_scope
+    test_name = st.selectbox(
+        "Show history for test:", [""] + dashboard.history.test_names(test_service), key="history_test"
+    )
+    if test_name:
+        test_df = pd.DataFrame(dashboard.history.test_trend(test_name, service=test_service))
+        test_df['result'] = test_df['passed'].map({True: "passed", False: "failed"})
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Pass Rate", f"{100.0 * test_df['passed'].mean():.1f}%",
+                      help=f"Over the last {len(test_df)} executions")
+            st.dataframe(
+                test_df[['run_id', 'started_at', 'status_code', 'response_time', 'result']].iloc[::-1],
+                use_container_width=True
+            )
+        with col2:
+            fig = px.scatter(test_df, x="started_at", y="response_time", color="result",
+                             color_discrete_map={"passed": "#10b981", "failed": "#ef4444"},
+                             title=f"{test_name}: Response Time (ms)")
+            st.plotly_chart(fig, use_container_width=True)
+
+    st.session_state['render_seconds'] = time.perf_counter() - render_started
+
+EXECUTION_TYPES = {
+    "regression": "Run the Regression Suite",
+    "service": "Run Individual Service",
+    "dependencies": "Run Services with Dependencies"
+}
+
+def cli(argv=None):
+    """Run tests without the dashboard; exits 0 when every test passed, 1 on failures and 2 on errors or mock data"""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="final_newman_report.py", description="Run Newman test collections headlessly")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="Run a collection and write the HTML and JSON reports")
+    run.add_argument("--collection", default="collections/test_collection.json", help="Postman collection file")
+    run.add_argument("--environment", help="Postman environment file")
+    run.add_argument("--type", choices=list(EXECUTION_TYPES), default="regression", help="What to run")
+    run.add_argument("--services", nargs="+", help="Service folders to run with --type service")
+    run.add_argument("--workers", type=int, help="Maximum parallel Newman processes")
+    run.add_argument("--shards", type=int, default=1, help="Duration-balanced shards per run")
+    run.add_argument("--engine", choices=["newman", "python", "agents"], default="newman", help="Execution engine")
+    run.add_argument("--agent-port", type=int, default=AGENT_PORT, help="Coordinator port with --engine agents")
+    run.add_argument("--concurrency", type=int, default=PYTHON_ENGINE_CONCURRENCY,
+                     help="Requests in flight with --engine python")
+    run.add_argument("--timings", action="store_true", help="Capture per-request timing phases (newman --verbose)")
+    run.add_argument("--reuse-minutes", type=int, default=0,
+                     help="Reuse results of unchanged folders from runs this recent instead of re-running them")
+    run.add_argument("--summary-json", help="Also write the run summary to this file")
+    run.add_argument("--email", help="Comma or semicolon separated recipients for the HTML report")
+    run.add_argument("--sender", default=os.environ.get("NEWMAN_REPORT_SENDER"), help="Sender email address")
+    run.add_argument("--smtp-server", default=os.environ.get("NEWMAN_REPORT_SMTP_SERVER", "smtp.gmail.com"))
+    run.add_argument("--smtp-port", type=int, default=int(os.environ.get("NEWMAN_REPORT_SMTP_PORT", 587)))
+    run.add_argument("--compression", choices=["auto", "gzip", "zip"], help="Compress the emailed report")
+
+    agent = subparsers.add_parser("agent", help="Run tests handed out by a coordinator on this host")
+    agent.add_argument("--coordinator", required=True, help="Coordinator URL, e.g. http://dashboard-host:8765")
+    agent.add_argument("--name", help="Name shown on the dashboard (defaults to host-pid)")
+    agent.add_argument("--slots", type=int, default=1, help="Runs this agent executes at the same time")
+    agent.add_argument("--engine", choices=["newman", "python"], default="newman", help="Local execution engine")
+    agent.add_argument("--concurrency", type=int, default=PYTHON_ENGINE_CONCURRENCY,
+                       help="Requests in flight with --engine python")
+
+    report = subparsers.add_parser("report", help="Render the HTML report for an existing Newman JSON report")
+    report.add_argument("json_report", help="Newman JSON report (.json or .json.gz)")
+    report.add_argument("--output", help="HTML file to write (defaults next to the JSON report)")
+
+    args = parser.parse_args(argv)
+    token = os.environ.get("NEWMAN_AGENT_TOKEN")
+
+    if args.command == "agent":
+        try:
+            worker = AgentWorker(args.coordinator, args.name, args.slots, token, args.engine)
+            worker.dashboard.python_engine_concurrency = args.concurrency
+            worker.serve()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    dashboard = TestDashboard(engine=getattr(args, "engine", "newman"))
+    dashboard.build_analytics = False
+
+    if args.command == "report":
+        output = args.output or re.sub(r'\.json(\.gz)?$', '', args.json_report) + ".html"
+        dashboard.generate_html_report(dashboard.load_json_report(args.json_report), output)
+        print(f"HTML report written to {output}")
+        return 0
+
+    if args.type == "service" and not args.services:
+        parser.error("--type service needs --services")
+
+    dashboard.capture_timings = args.timings
+    dashboard.reuse_window = args.reuse_minutes * 60
+    dashboard.python_engine_concurrency = args.concurrency
+    if args.engine == "agents":
+        dashboard.coordinator = AgentCoordinator(port=args.agent_port, token=token).start()
+        print(f"Waiting for agents on {dashboard.coordinator.host}:{args.agent_port}", file=sys.stderr)
+    results = dashboard.execute_tests(
+        EXECUTION_TYPES[args.type], args.collection, args.environment, args.services, args.workers, shards=args.shards
+    )
+    if not results.get('json_data'):
+        print(f"Test execution failed: {results.get('error', 'Unknown error')}", file=sys.stderr)
+        return 2
+
+    stats = results['json_data']['run']['stats']
+    failed = [
+        execution['item']['name'] for execution in results['json_data']['run'].get('executions', [])
+        if any(assertion.get('error') for assertion in execution.get('assertions', []))
+    ]
+    passed = not failed and stats['tests']['failed'] == 0
+    print(f"{'PASSED' if passed else 'FAILED'}: {stats['tests']['total']} tests, {stats['tests']['failed']} failed, "
+          f"{stats['requests']['total']} requests in {results['diagnostics']['total_seconds']:.1f}s"
+          f"{' (mock data, Newman not found)' if results.get('mock') else ''}")
+    clusters = results.get('clusters', [])
+    for cluster in clusters[:10]:
+        print(f"  ✗ {cluster['occurrences']}× [{cluster['service']} {cluster['status_code']}] {cluster['signature']}")
+    if len(clusters) > 10:
+        print(f"  … and {len(clusters) - 10} more root causes")
+    print(f"HTML report: {results.get('html_report')}")
+    print(f"JSON report: {results.get('json_report')}")
+    parquet_export = results['diagnostics'].get('parquet_export')
+    if parquet_export and not parquet_export['success']:
+        print(f"Warning: {parquet_export['message']}", file=sys.stderr)
+
+    if args.summary_json:
+        with open(args.summary_json, 'w') as f:
+            json.dump({
+                "run_id": results.get('run_id'),
+                "passed": passed,
+                "stats": stats,
+                "failed_tests": failed,
+                "failure_clusters": clusters,
+                "html_report": results.get('html_report'),
+                "json_report": results.get('json_report'),
+                "mock": bool(results.get('mock'))
+            }, f, indent=2)
+
+    if args.email:
+        smtp_config = {
+            "sender_email": args.sender,
+            "sender_password": os.environ.get("NEWMAN_REPORT_SMTP_PASSWORD", ""),
+            "smtp_server": args.smtp_server,
+            "smtp_port": args.smtp_port
+        }
+        sent, message = dashboard.send_email_report(results['html_report'], args.email, smtp_config, args.compression)
+        print(message, file=sys.stdout if sent else sys.stderr)
+
+    if results.get('mock'):
+        # Mock data means nothing was actually tested
+        return 2
+    return 0 if passed else 1
+
 if __name__ == "__main__":
-    main()
+    # `streamlit run` has already imported streamlit before executing this file
+    if "streamlit" in sys.modules:
+        main()
+    else:
+        sys.exit(cli())
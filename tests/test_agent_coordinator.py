@@ -0,0 +1,57 @@
+import json
+import threading
+import time
+
+import pytest
+
+from final_newman_report import AgentCoordinator
+
+
+@pytest.fixture
+def collection(tmp_path):
+    path = tmp_path / "collection.json"
+    path.write_text(json.dumps({"info": {"name": "c"}, "item": []}))
+    return str(path)
+
+
+def queue_run(coordinator, collection):
+    thread = threading.Thread(target=coordinator.run, args=(collection,), kwargs={"folder": "Inventory Service"},
+                              daemon=True)
+    thread.start()
+    return thread
+
+
+def test_dropped_agent_does_not_swallow_queued_task(collection):
+    coordinator = AgentCoordinator(run_timeout=5)
+    stalled = coordinator.register("stalled")
+    live = coordinator.register("live")
+
+    polled = []
+    poll = threading.Thread(target=lambda: polled.append(coordinator.next_task(stalled, wait_seconds=2)))
+    poll.start()
+    time.sleep(0.1)
+
+    # The reaper drops the stalled agent while its long-poll is still waiting, then a run arrives
+    with coordinator.lock:
+        del coordinator.agents[stalled]
+    queue_run(coordinator, collection)
+    poll.join()
+
+    assert polled == [None]
+    assignment = coordinator.next_task(live, wait_seconds=1)
+    assert assignment and assignment["task"]["folder"] == "Inventory Service"
+
+
+def test_unknown_agent_gets_nothing(collection):
+    coordinator = AgentCoordinator(run_timeout=5)
+    queue_run(coordinator, collection)
+    time.sleep(0.1)
+    assert coordinator.next_task("missing", wait_seconds=0.1) is None
+    assert coordinator.queued() == 1
+
+
+def test_coordinator_stays_on_loopback_without_token():
+    assert AgentCoordinator().host == "127.0.0.1"
+    assert AgentCoordinator(token="secret").host == "0.0.0.0"
+    with pytest.raises(ValueError):
+        AgentCoordinator(host="0.0.0.0")
@@ -0,0 +1,153 @@
+import asyncio
+import importlib.util
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from final_newman_report import AsyncCollectionRunner
+
+needs_aiohttp = pytest.mark.skipif(importlib.util.find_spec("aiohttp") is None, reason="needs aiohttp")
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        with Handler.lock:
+            Handler.in_flight += 1
+            Handler.peak = max(Handler.peak, Handler.in_flight)
+        time.sleep(0.05)
+        with Handler.lock:
+            Handler.in_flight -= 1
+
+        body = json.dumps({
+            "id": 7,
+            "items": [{"sku": "a"}],
+            "auth": self.headers.get("Authorization")
+        }).encode()
+        self.send_response(404 if "missing" in self.path else 200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("X-Trace", "1")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    Handler.peak = 0
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def item(name, path, tests):
+    return {
+        "name": name,
+        "request": {"method": "GET", "url": "{{base}}" + path},
+        "event": [{"listen": "test", "script": {"exec": tests}}]
+    }
+
+
+def collection(base, items):
+    return {
+        "info": {"name": "c"},
+        "auth": {"type": "bearer", "bearer": [{"key": "token", "value": "{{token}}"}]},
+        "variable": [{"key": "base", "value": base}],
+        "item": [{"name": "Inventory Service", "item": items}]
+    }
+
+
+def response(code=200, body=None, headers=("content-type",), response_time=10):
+    return {"code": code, "headers": set(headers), "responseTime": response_time, "json": body}
+
+
+def test_evaluate_status_code():
+    runner = AsyncCollectionRunner({})
+    assert runner.evaluate("", "pm.response.to.have.status(200);", response()) is None
+    assert "got 404" in runner.evaluate("", "pm.response.to.have.status(200);", response(code=404))
+    assert runner.evaluate("", "pm.expect(pm.response.code).to.be.oneOf([200, 201]);", response(code=201)) is None
+
+
+def test_evaluate_json_values_and_headers():
+    runner = AsyncCollectionRunner({})
+    script = "var jsonData = pm.response.json();"
+    body = {"id": 7, "items": [{"sku": "a"}]}
+    assert runner.evaluate(script, "pm.expect(jsonData.items[0].sku).to.eql('a');", response(body=body)) is None
+    assert runner.evaluate(script, "pm.expect(jsonData.id).to.eql(8);", response(body=body)) == \
+        "expected 7 to deeply equal 8"
+    assert "X-Trace" in runner.evaluate("", "pm.response.to.have.header('X-Trace');", response())
+
+
+def test_evaluate_response_time():
+    runner = AsyncCollectionRunner({})
+    check = "pm.expect(pm.response.responseTime).to.be.below(100);"
+    assert runner.evaluate("", check, response(response_time=50)) is None
+    assert runner.evaluate("", check, response(response_time=150)) == "expected 150 to be below 100"
+
+
+def test_evaluate_unsupported_script():
+    assert AsyncCollectionRunner({}).evaluate("", "console.log(1);", response()) is False
+
+
+@needs_aiohttp
+def test_run_against_local_server(server):
+    items = [
+        item("ok", "/items/1", [
+            "pm.test('status', function () { pm.response.to.have.status(200); });",
+            "var jsonData = pm.response.json();",
+            "pm.test('id', () => { pm.expect(jsonData.id).to.eql(7); });",
+            "pm.test('custom', function () { console.log(1); });"
+        ]),
+        item("missing", "/missing", ["pm.test('status', function () { pm.response.to.have.status(200); });"])
+    ]
+    runner = AsyncCollectionRunner(collection(server, items), {"values": [{"key": "token", "value": "secret"}]})
+    run = asyncio.run(runner.run())["run"]
+
+    assert run["stats"]["requests"] == {"total": 2, "pending": 0, "failed": 0}
+    assert run["stats"]["tests"] == {"total": 2, "pending": 0, "failed": 1}
+    assert run["stats"]["assertions"] == {"total": 4, "pending": 1, "failed": 1}
+    executions = {execution["item"]["name"]: execution for execution in run["executions"]}
+    assert executions["ok"]["folder"] == "Inventory Service"
+    assert executions["missing"]["response"]["code"] == 404
+
+
+@needs_aiohttp
+def test_run_sends_inherited_auth(server):
+    items = [item("auth", "/items/1", [
+        "var jsonData = pm.response.json();",
+        "pm.test('token', () => { pm.expect(jsonData.auth).to.eql('Bearer secret'); });"
+    ])]
+    runner = AsyncCollectionRunner(collection(server, items), {"values": [{"key": "token", "value": "secret"}]})
+    run = asyncio.run(runner.run())["run"]
+    assert run["stats"]["assertions"]["failed"] == 0
+
+
+@needs_aiohttp
+def test_run_respects_concurrency(server):
+    items = [item(f"get {i}", f"/items/{i}", []) for i in range(12)]
+    runner = AsyncCollectionRunner(collection(server, items), concurrency=3)
+    run = asyncio.run(runner.run())["run"]
+    assert run["stats"]["requests"]["total"] == 12
+    assert Handler.peak <= 3
+
+
+@needs_aiohttp
+def test_run_reports_connection_errors():
+    items = [item("down", "/items/1", ["pm.test('status', function () { pm.response.to.have.status(200); });"])]
+    runner = AsyncCollectionRunner(collection("http://127.0.0.1:9", items), timeout=5)
+    run = asyncio.run(runner.run())["run"]
+    assert run["stats"]["requests"]["failed"] == 1
+    assert run["executions"][0]["assertions"][0]["error"]["message"]
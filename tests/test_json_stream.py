@@ -0,0 +1,105 @@
+import gzip
+import io
+import json
+
+import pytest
+
+import final_newman_report
+from final_newman_report import JsonStream
+
+DOCUMENT = {
+    "collection": {"info": {"name": "skipped"}, "item": [{"name": "a", "nested": [1, [2, {"x": "}]"}]]}]},
+    "run": {
+        "stats": {"tests": {"total": 2, "pending": 0, "failed": 1}},
+        "timings": {"responseAverage": 12345.678e-2, "started": 1700000000123},
+        "ignored": "a string with \"quotes\", commas, ] and } inside",
+        "executions": [
+            {"item": {"name": "first"}, "response": {"responseTime": 123456789, "code": 200}, "assertions": []},
+            {"item": {"name": "second ✓"}, "response": {"responseTime": -0.5e10, "code": 500},
+             "assertions": [{"assertion": "ok", "error": {"message": "expected 200"}}]}
+        ]
+    },
+    "trailing": [True, False, None, 0, -1.25]
+}
+TEXT = json.dumps(DOCUMENT, indent=1)
+
+
+def read_document(stream):
+    """Walk the document the way load_json_report does, skipping what it does not need"""
+    found = {}
+    for key in stream.object_keys():
+        if key != "run":
+            stream.skip()
+            continue
+        for run_key in stream.object_keys():
+            if run_key == "executions":
+                found[run_key] = list(stream.array_values())
+            elif run_key in ("stats", "timings"):
+                found[run_key] = stream.value()
+            else:
+                stream.skip()
+    return found
+
+
+EXPECTED = {key: DOCUMENT["run"][key] for key in ("stats", "timings", "executions")}
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 40))
+def test_tiny_chunks(chunk_size):
+    assert read_document(JsonStream(io.StringIO(TEXT), chunk_size=chunk_size)) == EXPECTED
+
+
+@pytest.mark.parametrize("number", ["123456789", "-0.5e10", "12345.678e-2", "1.25E+3", "0"])
+def test_number_at_buffer_edge(number):
+    # Split the document at every offset inside the number, so each prefix of it ends a chunk
+    text = '{"value": ' + number + ', "after": [' + number + ']}'
+    start = text.index(number)
+    for split in range(start + 1, start + len(number) + 1):
+        stream = JsonStream(io.StringIO(text), chunk_size=split)
+        values = {}
+        for key in stream.object_keys():
+            values[key] = stream.value()
+        assert values == {"value": json.loads(number), "after": [json.loads(number)]}, split
+
+
+def test_number_at_end_of_input():
+    assert JsonStream(io.StringIO("1234"), chunk_size=2).value() == 1234
+
+
+def test_skip_leaves_stream_on_next_value():
+    stream = JsonStream(io.StringIO('[{"a": [1, {"b": "]"}]}, "next"]'), chunk_size=3)
+    values = stream.array_values()
+    next(values)
+    assert next(values) == "next"
+
+
+def test_empty_containers():
+    stream = JsonStream(io.StringIO('{"a": {}, "b": []}'), chunk_size=1)
+    for key in stream.object_keys():
+        if key == "a":
+            assert list(stream.object_keys()) == []
+        else:
+            assert list(stream.array_values()) == []
+
+
+def test_malformed_document():
+    stream = JsonStream(io.StringIO('{"a": 1 "b": 2}'))
+    with pytest.raises(ValueError):
+        for key in stream.object_keys():
+            stream.value()
+
+
+def test_load_json_report_from_gzip(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    plain = tmp_path / "report.json"
+    plain.write_text(TEXT, encoding="utf-8")
+    compressed = tmp_path / "report.json.gz"
+    with gzip.open(compressed, "wt", encoding="utf-8") as f:
+        f.write(TEXT)
+
+    dashboard = final_newman_report.TestDashboard()
+    report = dashboard.load_json_report(str(compressed))
+    assert report == dashboard.load_json_report(str(plain))
+    assert report["run"]["stats"] == DOCUMENT["run"]["stats"]
+    assert [execution["item"]["name"] for execution in report["run"]["executions"]] == ["first", "second ✓"]
+    assert report["run"]["executions"][1]["assertions"][0]["error"] == {"message": "expected 200"}
@@ -0,0 +1,22 @@
+import sys
+
+import pytest
+
+import final_newman_report
+
+
+@pytest.fixture
+def dashboard(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return final_newman_report.TestDashboard()
+
+
+def test_output_keeps_only_a_bounded_tail(dashboard):
+    script = "import sys\nfor i in range(5000):\n    print(i)\n    print('err', i, file=sys.stderr)"
+    process, stdout, stderr, timed_out = dashboard.follow_newman_process(
+        [sys.executable, "-c", script], "collection.json", None, None
+    )
+    assert process.returncode == 0 and not timed_out
+    assert stdout.splitlines() == [str(i) for i in range(4800, 5000)]
+    assert stderr.splitlines()[-1] == "err 4999"
+    assert len(stderr.splitlines()) == 200
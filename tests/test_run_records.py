@@ -0,0 +1,98 @@
+import datetime
+import sqlite3
+
+import pytest
+
+import final_newman_report
+
+
+@pytest.fixture
+def dashboard(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return final_newman_report.TestDashboard()
+
+
+def finished_run(dashboard, mock=False, exported=None):
+    dashboard.export_parquet = lambda results: exported.append(results['run_id']) or (True, "dataset")
+    results = dashboard.generate_mock_results(dashboard.reports.report_paths(dashboard.reports.new_run_id())[0])
+    results['mock'] = mock
+    return dashboard.finish_run(results, datetime.datetime.now(), "Run the Regression Suite")
+
+
+def recorded_runs(dashboard):
+    with sqlite3.connect(dashboard.history.db_path) as conn:
+        return [run_id for (run_id,) in conn.execute("SELECT run_id FROM runs")]
+
+
+def test_real_runs_are_recorded_and_exported(dashboard):
+    exported = []
+    results = finished_run(dashboard, exported=exported)
+    assert recorded_runs(dashboard) == [results['run_id']]
+    assert exported == [results['run_id']]
+    assert dashboard.reports.run_reports() == [(results['run_id'], results['json_report'])]
+
+
+def test_mock_runs_stay_out_of_history_and_dataset(dashboard):
+    exported = []
+    results = finished_run(dashboard, mock=True, exported=exported)
+    assert results['clusters']
+    assert recorded_runs(dashboard) == []
+    assert exported == []
+    assert dashboard.reports.run_reports() == []
+
+
+def real_run(dashboard, name):
+    """Finish a synthetic run as if Newman had produced it"""
+    results = dashboard.generate_mock_results(dashboard.reports.report_paths(name)[0])
+    results['mock'] = False
+    return dashboard.finish_run(results, datetime.datetime.now(), "Run the Regression Suite")
+
+
+def dataset_parts(dashboard, run_id):
+    return list(final_newman_report.Path(dashboard.dataset_path).rglob(f"part-{run_id}-*.parquet"))
+
+
+def test_retention_prunes_history_and_dataset(dashboard):
+    pytest.importorskip("pyarrow")
+    dashboard.reports.max_runs = 1
+    first = real_run(dashboard, "a")
+    first_parts = dataset_parts(dashboard, first['run_id'])
+    assert first_parts
+
+    second = real_run(dashboard, "b")
+
+    assert recorded_runs(dashboard) == [second['run_id']]
+    assert not any(part.exists() for part in first_parts)
+    assert dataset_parts(dashboard, second['run_id'])
+    with sqlite3.connect(dashboard.history.db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM executions WHERE run_id = ?", (first['run_id'],)).fetchone()[0] == 0
+
+
+def test_dataset_counts_against_the_size_budget(dashboard):
+    pytest.importorskip("pyarrow")
+    results = real_run(dashboard, "a")
+    with sqlite3.connect(dashboard.reports.db_path) as conn:
+        kinds = {kind for (kind,) in conn.execute("SELECT kind FROM report_files WHERE run_id = ?", (results['run_id'],))}
+    assert "dataset" in kinds
+
+
+def test_history_older_than_max_age_is_dropped(dashboard):
+    old = datetime.datetime.now() - datetime.timedelta(days=dashboard.reports.max_age_days + 1)
+    results = dashboard.generate_mock_results(dashboard.reports.report_paths("old")[0])
+    dashboard.history.record_run("old", old, "Run the Regression Suite", results)
+    dashboard.apply_retention()
+    assert recorded_runs(dashboard) == []
+
+
+def test_test_trend_is_indexed_by_name_and_service(dashboard):
+    results = dashboard.generate_mock_results(dashboard.reports.report_paths("t")[0])
+    execution = results['json_data']['run']['executions'][0]
+    execution['folder'] = service = "Accounts"
+    name = execution['item']['name']
+    dashboard.history.record_run("t", datetime.datetime.now(), "Run the Regression Suite", results)
+
+    assert name in dashboard.history.test_names()
+    assert name in dashboard.history.test_names(service)
+    trend = dashboard.history.test_trend(name, service=service)
+    assert trend and all(row['run_id'] == "t" for row in trend)
+    assert dashboard.history.test_trend(name, service="No Such Service") == []
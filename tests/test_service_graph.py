@@ -0,0 +1,111 @@
+import threading
+import time
+
+import pytest
+
+import final_newman_report
+
+
+class FakeRunner:
+    """Stands in for run_newman_command: records start and end times and fails the chosen services"""
+
+    def __init__(self, durations=None, failing=()):
+        self.durations = durations or {}
+        self.failing = set(failing)
+        self.lock = threading.Lock()
+        self.started = {}
+        self.finished = {}
+
+    def __call__(self, collection_path, environment=None, folder=None, progress=None, label=None):
+        with self.lock:
+            self.started[folder] = time.perf_counter()
+        time.sleep(self.durations.get(folder, 0.01))
+        passed = folder not in self.failing
+        with self.lock:
+            self.finished[folder] = time.perf_counter()
+        execution = {
+            "item": {"name": f"{folder} request"},
+            "response": {"responseTime": 5, "code": 200 if passed else 500},
+            "assertions": [{"assertion": "ok", "error": None if passed else {"message": "expected 200"}}]
+        }
+        counts = {"total": 1, "pending": 0, "failed": 0 if passed else 1}
+        return {
+            "success": passed,
+            "json_data": {"run": {
+                "stats": {"tests": dict(counts), "assertions": dict(counts), "requests": dict(counts, failed=0)},
+                "timings": {"responseAverage": 5, "responseMin": 5, "responseMax": 5},
+                "executions": [execution]
+            }}
+        }
+
+
+@pytest.fixture
+def dashboard(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return final_newman_report.TestDashboard()
+
+
+def test_order_puts_prerequisites_first(dashboard):
+    graph = {"C": ["A", "B"], "B": ["A"], "A": [], "D": []}
+    order = dashboard.order_services(graph)
+    assert sorted(order) == ["A", "B", "C", "D"]
+    for service, prerequisites in graph.items():
+        assert all(order.index(p) < order.index(service) for p in prerequisites)
+
+
+def test_cycle_is_rejected(dashboard, monkeypatch):
+    graph = {"A": ["C"], "B": ["A"], "C": ["B"], "D": []}
+    with pytest.raises(ValueError, match="A, B, C"):
+        dashboard.order_services(graph)
+
+    runner = FakeRunner()
+    monkeypatch.setattr(dashboard, "run_newman_command", runner)
+    results = dashboard.run_service_graph("collection.json", None, graph)
+    assert results["success"] is False
+    assert "Circular service dependencies" in results["error"]
+    assert runner.started == {}
+
+
+def test_failure_skips_everything_downstream(dashboard, monkeypatch):
+    graph = {"Auth": [], "Payments": ["Auth"], "Orders": ["Payments", "Inventory"], "Inventory": [], "Notify": ["Orders"]}
+    runner = FakeRunner(failing={"Auth"})
+    monkeypatch.setattr(dashboard, "run_newman_command", runner)
+
+    results = dashboard.run_service_graph("collection.json", None, graph, max_workers=4)
+    folders = results["folder_results"]
+
+    assert set(runner.started) == {"Auth", "Inventory"}
+    assert folders["Payments"]["skipped"] and folders["Payments"]["error"] == "Skipped because Auth did not pass"
+    assert folders["Orders"]["error"] == "Skipped because Payments did not pass"
+    assert folders["Notify"]["error"] == "Skipped because Orders did not pass"
+    assert folders["Inventory"]["success"]
+    assert results["success"] is False
+    assert [e["item"]["name"] for e in results["json_data"]["run"]["executions"]] == \
+        ["Auth request", "Inventory request"]
+
+
+def test_dependent_starts_when_its_prerequisite_passes(dashboard, monkeypatch):
+    # Fast finishes long before Slow; Dependent only needs Fast, so it must not wait for Slow
+    graph = {"Slow": [], "Fast": [], "Dependent": ["Fast"]}
+    runner = FakeRunner(durations={"Slow": 0.6, "Fast": 0.05, "Dependent": 0.05})
+    monkeypatch.setattr(dashboard, "run_newman_command", runner)
+
+    results = dashboard.run_service_graph("collection.json", None, graph, max_workers=3)
+
+    assert results["success"] is True
+    assert runner.started["Dependent"] >= runner.finished["Fast"]
+    assert runner.finished["Dependent"] < runner.finished["Slow"]
+
+
+def test_prerequisites_are_pulled_in(dashboard, monkeypatch):
+    runner = FakeRunner()
+    monkeypatch.setattr(dashboard, "run_newman_command", runner)
+
+    results = dashboard.run_services_with_dependencies("collection.json", services=["Order Management Service"])
+
+    assert set(runner.started) == {
+        "Order Management Service", "Payment Gateway Service", "Inventory Service", "User Authentication Service"
+    }
+    assert runner.started["User Authentication Service"] < runner.started["Payment Gateway Service"]
+    assert runner.started["Payment Gateway Service"] < runner.started["Order Management Service"]
+    assert results["success"] is True
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+import final_newman_report
+
+
+def request(name, url, script=None):
+    item = {"name": name, "request": {"method": "GET", "url": url}}
+    if script:
+        item["event"] = [{"listen": "test", "script": {"exec": [script]}}]
+    return item
+
+
+COLLECTION = {
+    "info": {"name": "c"},
+    "item": [
+        {"name": "User Service", "item": [
+            request("Login", "http://x/login", "pm.environment.set('token', pm.response.json().token);"),
+            request("Profile", "http://x/profile?t={{token}}"),
+            request("Orders", "http://x/orders?t={{token}}"),
+            request("Cart", "http://x/cart?t={{token}}"),
+            request("Health check", "http://x/users/health")
+        ]},
+        {"name": "Inventory Service", "item": [
+            request("Stock", "http://x/stock"),
+            request("Health check", "http://x/inventory/health")
+        ]},
+        {"name": "Payment Gateway Service", "item": [
+            request("Health check", "http://x/payments/health")
+        ]}
+    ]
+}
+
+
+def fake_newman(collection_path, environment=None, folder=None, progress=None, label=None):
+    """Report one passing execution per request, in collection order like Newman"""
+    with open(collection_path) as f:
+        collection = json.load(f)
+
+    def leaves(items):
+        for item in items:
+            if "item" in item:
+                yield from leaves(item["item"])
+            else:
+                yield item
+
+    executions = [
+        {"item": {"name": item["name"]}, "request": {"url": item["request"]["url"]},
+         "response": {"responseTime": 5, "code": 200}, "assertions": []}
+        for item in leaves(collection["item"])
+    ]
+    counts = {"total": len(executions), "pending": 0, "failed": 0}
+    return {"success": True, "json_data": {"run": {
+        "stats": {"tests": dict(counts), "assertions": dict(counts), "requests": dict(counts)},
+        "timings": {"responseAverage": 5, "responseMin": 5, "responseMax": 5},
+        "executions": executions
+    }}}
+
+
+@pytest.fixture
+def dashboard(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    dashboard = final_newman_report.TestDashboard()
+    monkeypatch.setattr(dashboard, "historical_durations", lambda: {})
+    return dashboard
+
+
+def shard_names(dashboard, shards):
+    requests = dashboard.collection_requests(COLLECTION)
+    _, shard_requests = dashboard.write_shards(COLLECTION, requests, shards)
+    return [[name for _, _, name in requests] for requests in shard_requests]
+
+
+def test_setup_chain_stays_in_one_shard(dashboard):
+    shards = shard_names(dashboard, 3)
+    chain = [names for names in shards if "Login" in names][0]
+    assert chain[:4] == ["Login", "Profile", "Orders", "Cart"]
+    assert sum(len(names) for names in shards) == 8
+
+
+def test_independent_requests_are_still_balanced(dashboard):
+    shards = shard_names(dashboard, 3)
+    assert len(shards) == 3
+    assert all(shards)
+
+
+def test_rerun_pulls_in_setup_requests(dashboard):
+    requests = dashboard.collection_requests(COLLECTION)
+    keep = dashboard.requests_with_setup(COLLECTION, requests, {"Cart"})
+    assert sorted(name for path, _, name in requests if path in keep) == ["Cart", "Login"]
+
+
+def test_duplicate_names_keep_their_folder(dashboard, monkeypatch):
+    monkeypatch.setattr(dashboard, "run_newman_command", fake_newman)
+    with open("collection.json", "w") as f:
+        json.dump(COLLECTION, f)
+
+    results = dashboard.run_sharded("collection.json", shards=3, max_workers=3)
+
+    folders = {
+        execution["request"]["url"]: execution["folder"]
+        for execution in results["json_data"]["run"]["executions"]
+    }
+    assert folders["http://x/users/health"] == "User Service"
+    assert folders["http://x/inventory/health"] == "Inventory Service"
+    assert folders["http://x/payments/health"] == "Payment Gateway Service"
+    assert folders["http://x/profile?t={{token}}"] == "User Service"
@@ -0,0 +1,79 @@
+import smtplib
+
+import pytest
+
+from final_newman_report import SmtpConnectionPool
+
+CONFIG = {"smtp_server": "mail.example.com", "smtp_port": 587, "sender_email": "qa@example.com"}
+
+
+class FakeSMTP:
+    """Records the SMTP conversation instead of opening a socket"""
+    offers_starttls = True
+    instances = []
+
+    def __init__(self, host, port, timeout=None, context=None):
+        self.calls = []
+        FakeSMTP.instances.append(self)
+
+    def ehlo(self):
+        self.calls.append("ehlo")
+
+    def has_extn(self, name):
+        return name == "starttls" and self.offers_starttls
+
+    def starttls(self, context=None):
+        self.calls.append("starttls")
+
+    def login(self, user, password):
+        self.calls.append("login")
+
+    def noop(self):
+        return 250, b"ok"
+
+    def send_message(self, msg, to_addrs=None):
+        self.calls.append("send")
+
+    def quit(self):
+        self.calls.append("quit")
+
+    def close(self):
+        self.calls.append("close")
+
+
+@pytest.fixture
+def fake_smtp(monkeypatch):
+    FakeSMTP.offers_starttls = True
+    FakeSMTP.instances = []
+    monkeypatch.setattr(smtplib, "SMTP", FakeSMTP)
+    monkeypatch.setattr(smtplib, "SMTP_SSL", FakeSMTP)
+    return FakeSMTP
+
+
+def test_login_happens_after_starttls(fake_smtp):
+    SmtpConnectionPool().connect(dict(CONFIG, sender_password="secret"))
+    assert fake_smtp.instances[0].calls == ["ehlo", "starttls", "ehlo", "login"]
+
+
+def test_password_is_not_sent_without_starttls(fake_smtp):
+    fake_smtp.offers_starttls = False
+    with pytest.raises(smtplib.SMTPNotSupportedError):
+        SmtpConnectionPool().connect(dict(CONFIG, sender_password="secret"))
+    assert "login" not in fake_smtp.instances[0].calls
+    assert fake_smtp.instances[0].calls[-1] == "quit"
+
+
+def test_debug_server_without_credentials_may_skip_tls(fake_smtp):
+    fake_smtp.offers_starttls = False
+    SmtpConnectionPool().connect(CONFIG)
+    assert fake_smtp.instances[0].calls == ["ehlo"]
+
+
+def test_pool_key_separates_credentials():
+    pool = SmtpConnectionPool()
+    assert pool.key(dict(CONFIG, sender_password="a")) != pool.key(dict(CONFIG, sender_password="b"))
+
+
+def test_pool_without_idle_slots_closes_connection(fake_smtp):
+    SmtpConnectionPool(max_idle=0).send(CONFIG, None, ["dev@example.com"])
+    assert fake_smtp.instances[0].calls[-2:] == ["send", "quit"]